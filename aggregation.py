@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Aggregation backends for daily top lists.
+
+The NumPy backend is used when numpy is installed; the pure-Python backend
+produces identical results without it.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from title_index import TitleIndex
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+BACKENDS = ("auto", "python", "numpy")
+
+
+def parse_entries(
+    daily: Iterable[Dict[str, object]], index: TitleIndex
+) -> Tuple[List[int], List[int]]:
+    ids: List[int] = []
+    views: List[int] = []
+    for entry in daily:
+        article = entry.get("article")
+        if not article:
+            continue
+        try:
+            value = int(entry.get("views", 0))
+        except (TypeError, ValueError):
+            continue
+        ids.append(index.intern(article))
+        views.append(value)
+    return ids, views
+
+
+class PythonAggregate:
+    backend = "python"
+
+    def __init__(self, daily_lists: Iterable[List[Dict[str, object]]]) -> None:
+        self.index = TitleIndex()
+        self._days: List[Dict[int, int]] = []
+        self._totals: List[int] = []
+        for daily in daily_lists:
+            ids, views = parse_entries(daily, self.index)
+            if len(self._totals) < len(self.index):
+                self._totals.extend([0] * (len(self.index) - len(self._totals)))
+            day_map: Dict[int, int] = {}
+            for title_id, value in zip(ids, views):
+                day_map[title_id] = value
+                self._totals[title_id] += value
+            self._days.append(day_map)
+
+    @property
+    def day_count(self) -> int:
+        return len(self._days)
+
+    def ranked_ids(self) -> List[int]:
+        return sorted(
+            range(len(self._totals)), key=self._totals.__getitem__, reverse=True
+        )
+
+    def totals(self, ordered: bool = False) -> Dict[str, int]:
+        ids = self.ranked_ids() if ordered else range(len(self._totals))
+        return {self.index.title(title_id): self._totals[title_id] for title_id in ids}
+
+    def daily_views(self, title: str) -> List[int]:
+        title_id = self.index.lookup(title)
+        if title_id is None:
+            return [0] * len(self._days)
+        return [day_map.get(title_id, 0) for day_map in self._days]
+
+
+class NumpyAggregate:
+    backend = "numpy"
+
+    def __init__(self, daily_lists: Iterable[List[Dict[str, object]]]) -> None:
+        self.index = TitleIndex()
+        parsed = [parse_entries(daily, self.index) for daily in daily_lists]
+        title_count = len(self.index)
+        self._matrix = np.zeros((len(parsed), title_count), dtype=np.int64)
+        self._totals = np.zeros(title_count, dtype=np.int64)
+        for row, (ids, views) in enumerate(parsed):
+            if not ids:
+                continue
+            id_array = np.asarray(ids, dtype=np.int64)
+            view_array = np.asarray(views, dtype=np.int64)
+            self._matrix[row, id_array] = view_array
+            np.add.at(self._totals, id_array, view_array)
+
+    @property
+    def day_count(self) -> int:
+        return int(self._matrix.shape[0])
+
+    def ranked_ids(self) -> List[int]:
+        return np.argsort(-self._totals, kind="stable").tolist()
+
+    def totals(self, ordered: bool = False) -> Dict[str, int]:
+        ids = self.ranked_ids() if ordered else range(len(self._totals))
+        values = self._totals.tolist()
+        return {self.index.title(title_id): values[title_id] for title_id in ids}
+
+    def daily_views(self, title: str) -> List[int]:
+        title_id = self.index.lookup(title)
+        if title_id is None:
+            return [0] * self.day_count
+        return self._matrix[:, title_id].tolist()
+
+
+class StreamingAggregate:
+    backend = "streaming"
+
+    def __init__(self, day_count: int, keep_days: bool = False) -> None:
+        # keep_days holds every day's id/view arrays for callers that cannot
+        # read the days again; otherwise add_selected rebuilds the vectors.
+        self.index = TitleIndex()
+        self._totals: List[int] = []
+        self._day_count = day_count
+        self._days: Optional[List[Optional[Tuple[array, array]]]] = (
+            [None] * day_count if keep_days else None
+        )
+        self._vectors: Dict[int, List[int]] = {}
+
+    @property
+    def day_count(self) -> int:
+        return self._day_count
+
+    @property
+    def keeps_days(self) -> bool:
+        return self._days is not None
+
+    def add_day(self, position: int, daily: Iterable[Dict[str, object]]) -> None:
+        ids, views = parse_entries(daily, self.index)
+        if len(self._totals) < len(self.index):
+            self._totals.extend([0] * (len(self.index) - len(self._totals)))
+        for title_id, value in zip(ids, views):
+            self._totals[title_id] += value
+        if self._days is not None:
+            self._days[position] = (array("l", ids), array("q", views))
+
+    def ranked_ids(self) -> List[int]:
+        return sorted(
+            range(len(self._totals)), key=self._totals.__getitem__, reverse=True
+        )
+
+    def totals(self, ordered: bool = False) -> Dict[str, int]:
+        ids = self.ranked_ids() if ordered else range(len(self._totals))
+        return {self.index.title(title_id): self._totals[title_id] for title_id in ids}
+
+    def select(self, titles: Iterable[str]) -> None:
+        self._vectors = {
+            title_id: [0] * self._day_count
+            for title_id in (self.index.lookup(title) for title in titles)
+            if title_id is not None
+        }
+        if self._days is None:
+            return
+        for position, day in enumerate(self._days):
+            if day is None:
+                continue
+            for title_id, value in zip(*day):
+                if title_id in self._vectors:
+                    self._vectors[title_id][position] = value
+        self._days = None
+
+    def add_selected(self, position: int, daily: Iterable[Dict[str, object]]) -> None:
+        for entry in daily:
+            title_id = self.index.lookup(entry.get("article") or "")
+            if title_id is None or title_id not in self._vectors:
+                continue
+            try:
+                self._vectors[title_id][position] = int(entry.get("views", 0))
+            except (TypeError, ValueError):
+                continue
+
+    def daily_views(self, title: str) -> List[int]:
+        title_id = self.index.lookup(title)
+        if title_id is None or title_id not in self._vectors:
+            return [0] * self._day_count
+        return list(self._vectors[title_id])
+
+
+def aggregate_daily_lists(
+    daily_lists: Iterable[List[Dict[str, object]]], backend: str = "auto"
+) -> Union[PythonAggregate, NumpyAggregate]:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown aggregation backend '{backend}'")
+    if backend == "numpy" and np is None:
+        raise RuntimeError("The numpy aggregation backend requires numpy to be installed")
+    if backend == "python" or np is None:
+        return PythonAggregate(daily_lists)
+    return NumpyAggregate(daily_lists)
+
@@ -2,15 +2,25 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import csv
+import json
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
 
 import requests
 
+from day_coverage import DayCoverage, calendar_legend, format_day_range
+from http_transport import add_transport_arguments, session_from_args
+from pageviews_cache import DailyTopCache, add_cache_arguments, cache_from_args
+from probe_results import ProbeResultCache, add_probe_cache_arguments, probe_cache_from_args
+from week_manifest import WeekManifest
+from week_validation import DEFAULT_VALIDATION_CACHE, ValidationCache, validate_weeks
 
 API_BASE = "https://wikimedia.org/api/rest_v1/metrics/pageviews/top"
 DEFAULT_PROJECT = "it.wikipedia"
@@ -20,6 +30,19 @@ DEFAULT_USER_AGENT = (
     "(https://github.com/michelemauri/it-wiki-top25-weekly)"
 )
 WEEK_FILE_PATTERN = re.compile(r"^(\d{4})-(\d{2})\.json$")
+DEFAULT_PROBE_WORKERS = 8
+SUMMARY_FIELDS = (
+    "week",
+    "start",
+    "end",
+    "status",
+    "available_days",
+    "missing_days",
+    "error_days",
+    "cached_days",
+    "missing_dates",
+    "error_dates",
+)
 
 
 @dataclass(frozen=True, order=True)
@@ -34,6 +57,18 @@ class WeekId:
         return f"{self.year}-{self.week:02d}"
 
 
+@dataclass(frozen=True)
+class DayProbe:
+    day: date
+    status: int
+    detail: str = ""
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
 @dataclass(frozen=True)
 class WeekRange:
     start: WeekId
@@ -58,6 +93,12 @@ def parse_args() -> argparse.Namespace:
         default="docs/json",
         help="Directory containing weekly JSON files (default: docs/json)",
     )
+    parser.add_argument(
+        "--raw-json-dir",
+        type=str,
+        default="docs/rawjson",
+        help="Directory containing raw weekly JSON files (default: docs/rawjson)",
+    )
     parser.add_argument(
         "--min-year",
         type=int,
@@ -67,6 +108,56 @@ def parse_args() -> argparse.Namespace:
             "the first existing JSON file"
         ),
     )
+    parser.add_argument(
+        "--days",
+        action="store_true",
+        help=(
+            "Print day-level coverage: counts per status and ranges of days "
+            "that are 404, request errors, pending or in missing weeks"
+        ),
+    )
+    parser.add_argument(
+        "--calendar",
+        action="store_true",
+        help="Print an ASCII calendar of day-level coverage, one row per month",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help=(
+            "Check every weekly JSON and raw JSON file for consistency "
+            "(ranks, article count, daily_views, days, json/rawjson agreement)"
+        ),
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help=(
+            "Number of articles every enriched week must have for --validate "
+            "(default: not checked, only against total_articles)"
+        ),
+    )
+    parser.add_argument(
+        "--validate-workers",
+        type=int,
+        default=None,
+        help="Processes used by --validate (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--validation-cache",
+        type=str,
+        default=DEFAULT_VALIDATION_CACHE,
+        help=(
+            "Results of --validate keyed by file size, mtime and hash, so only "
+            f"changed files are checked again (default: {DEFAULT_VALIDATION_CACHE})"
+        ),
+    )
+    parser.add_argument(
+        "--no-validation-cache",
+        action="store_true",
+        help="Validate every file again and do not write the validation cache",
+    )
     parser.add_argument(
         "--probe-week",
         action="append",
@@ -74,6 +165,32 @@ def parse_args() -> argparse.Namespace:
         metavar="YYYY-WW",
         help="Probe a specific missing week against Wikimedia; repeatable",
     )
+    parser.add_argument(
+        "--probe-all-missing",
+        action="store_true",
+        help=(
+            "Probe every missing week of the audited range concurrently, with "
+            "HEAD requests, and classify each week"
+        ),
+    )
+    parser.add_argument(
+        "--probe-workers",
+        type=int,
+        default=DEFAULT_PROBE_WORKERS,
+        help=f"Days probed concurrently (default: {DEFAULT_PROBE_WORKERS})",
+    )
+    parser.add_argument(
+        "--summary-format",
+        choices=("json", "csv"),
+        default=None,
+        help="Also write the probe classification of each week as JSON or CSV",
+    )
+    parser.add_argument(
+        "--summary-file",
+        type=str,
+        default="-",
+        help="Destination of --summary-format, '-' for stdout (default: -)",
+    )
     parser.add_argument(
         "--timeout",
         type=float,
@@ -98,7 +215,13 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_USER_AGENT,
         help="User-Agent for Wikimedia requests",
     )
-    return parser.parse_args()
+    add_transport_arguments(parser)
+    add_cache_arguments(parser)
+    add_probe_cache_arguments(parser)
+    args = parser.parse_args()
+    if args.summary_format and not (args.probe_week or args.probe_all_missing):
+        parser.error("--summary-format needs --probe-week or --probe-all-missing")
+    return args
 
 
 def load_existing_weeks(json_dir: Path) -> List[WeekId]:
@@ -157,30 +280,201 @@ def week_dates(week_id: WeekId) -> List[date]:
     return [start + timedelta(days=offset) for offset in range(7)]
 
 
-def probe_week(
+def probe_day(
     session: requests.Session,
-    week_id: WeekId,
+    day: date,
     project: str,
     access: str,
     timeout: float,
-) -> List[Tuple[date, int, str]]:
-    failures: List[Tuple[date, int, str]] = []
-    for day in week_dates(week_id):
-        url = f"{API_BASE}/{project}/{access}/{day:%Y/%m/%d}"
-        try:
+    cache: Optional[DailyTopCache] = None,
+    probe_cache: Optional[ProbeResultCache] = None,
+    full: bool = True,
+) -> DayProbe:
+    if cache is not None:
+        cached = cache.get(project, access, day)
+        if cached is not None:
+            return DayProbe(day, cached.status, cached.detail, cached=True)
+    if probe_cache is not None:
+        known = probe_cache.get(project, access, day)
+        if known is not None:
+            return DayProbe(day, known[0], known[1], cached=True)
+
+    # HEAD answers with the same status as GET without the ~100 KB list.
+    url = f"{API_BASE}/{project}/{access}/{day:%Y/%m/%d}"
+    try:
+        response = session.request("GET" if full else "HEAD", url, timeout=timeout)
+        if not full and response.status_code in (405, 501):
+            full = True
             response = session.get(url, timeout=timeout)
-        except requests.RequestException as exc:
-            failures.append((day, 0, str(exc)))
-            continue
+    except requests.RequestException as exc:
+        return DayProbe(day, 0, str(exc))
 
-        if response.status_code >= 400:
-            snippet = response.text.strip().replace("\n", " ")
-            failures.append((day, response.status_code, snippet[:180]))
-    return failures
+    if response.status_code >= 400:
+        snippet = response.text.strip().replace("\n", " ")[:180]
+        if cache is not None and response.status_code == 404:
+            cache.put_missing(project, access, day, snippet)
+        if probe_cache is not None:
+            probe_cache.put(project, access, day, response.status_code, snippet)
+        return DayProbe(day, response.status_code, snippet)
 
+    if cache is not None and full:
+        store_probe_response(cache, project, access, day, response)
+    if probe_cache is not None:
+        probe_cache.put(project, access, day, response.status_code)
+    return DayProbe(day, response.status_code)
 
-def main() -> int:
-    args = parse_args()
+
+def probe_weeks(
+    session: requests.Session,
+    weeks: Sequence[WeekId],
+    project: str,
+    access: str,
+    timeout: float,
+    cache: Optional[DailyTopCache] = None,
+    probe_cache: Optional[ProbeResultCache] = None,
+    full: bool = True,
+    workers: int = DEFAULT_PROBE_WORKERS,
+) -> Dict[WeekId, List[DayProbe]]:
+    days = list(dict.fromkeys(day for week_id in weeks for day in week_dates(week_id)))
+    # The session's rate limiter still applies across all workers.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        probes = dict(
+            zip(
+                days,
+                executor.map(
+                    lambda day: probe_day(
+                        session, day, project, access, timeout, cache, probe_cache, full
+                    ),
+                    days,
+                ),
+            )
+        )
+    return {week_id: [probes[day] for day in week_dates(week_id)] for week_id in weeks}
+
+
+def classify_week(probes: Sequence[DayProbe]) -> str:
+    # available: can be collected as is; partial: needs --allow-missing-days;
+    # unavailable: the API has no top list for any day; error: probe again.
+    if any(not probe.ok and probe.status != 404 for probe in probes):
+        return "error"
+    missing = sum(1 for probe in probes if probe.status == 404)
+    if missing == 0:
+        return "available"
+    if missing == len(probes):
+        return "unavailable"
+    return "partial"
+
+
+def summary_rows(results: Dict[WeekId, List[DayProbe]]) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    for week_id, probes in sorted(results.items()):
+        missing_dates = [probe.day.isoformat() for probe in probes if probe.status == 404]
+        error_dates = [
+            probe.day.isoformat() for probe in probes if not probe.ok and probe.status != 404
+        ]
+        rows.append(
+            {
+                "week": week_id.label(),
+                "start": probes[0].day.isoformat(),
+                "end": probes[-1].day.isoformat(),
+                "status": classify_week(probes),
+                "available_days": sum(1 for probe in probes if probe.ok),
+                "missing_days": len(missing_dates),
+                "error_days": len(error_dates),
+                "cached_days": sum(1 for probe in probes if probe.cached),
+                "missing_dates": missing_dates,
+                "error_dates": error_dates,
+            }
+        )
+    return rows
+
+
+def status_counts(rows: List[Dict[str, object]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for row in rows:
+        counts[str(row["status"])] = counts.get(str(row["status"]), 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def write_summary(rows: List[Dict[str, object]], fmt: str, handle: TextIO) -> None:
+    if fmt == "json":
+        json.dump({"counts": status_counts(rows), "weeks": rows}, handle, indent=2)
+        handle.write("\n")
+        return
+    writer = csv.DictWriter(handle, fieldnames=SUMMARY_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(
+            {
+                **row,
+                "missing_dates": " ".join(row["missing_dates"]),
+                "error_dates": " ".join(row["error_dates"]),
+            }
+        )
+
+
+def store_probe_response(
+    cache: DailyTopCache,
+    project: str,
+    access: str,
+    day: date,
+    response: requests.Response,
+) -> None:
+    try:
+        items = response.json().get("items")
+    except (ValueError, AttributeError):
+        return
+    if items and "articles" in items[0]:
+        cache.put_articles(project, access, day, items[0]["articles"])
+
+
+def print_day_coverage(coverage: DayCoverage, ranges: bool, heatmap: bool) -> None:
+    counts = coverage.counts()
+    print(
+        f"Day coverage {coverage.start.isoformat()} -> {coverage.end.isoformat()}: "
+        + ", ".join(f"{status} {count}" for status, count in counts.items())
+    )
+    if ranges:
+        for item in coverage.ranges():
+            print(f"- {format_day_range(item)}")
+    if heatmap:
+        print()
+        for line in coverage.calendar():
+            print(line)
+        print(calendar_legend())
+
+
+def run_validation(args: argparse.Namespace, existing: Sequence[WeekId]) -> int:
+    week_keys = sorted(
+        {week_id.label() for week_id in existing}
+        | {week_id.label() for week_id in load_existing_weeks(Path(args.raw_json_dir))}
+    )
+    cache = None if args.no_validation_cache else ValidationCache(args.validation_cache)
+    results, checked = validate_weeks(
+        week_keys,
+        args.json_dir,
+        args.raw_json_dir,
+        args.top,
+        cache,
+        args.validate_workers,
+    )
+    if cache is not None:
+        cache.save()
+
+    invalid = {week_key: found for week_key, found in results.items() if found}
+    print(
+        f"Validated weeks: {len(results)} ({checked} checked, "
+        f"{len(results) - checked} unchanged since the last validation)"
+    )
+    print(f"Weeks with violations: {len(invalid)}")
+    for week_key, violations in invalid.items():
+        print(f"- {week_key}:")
+        for violation in violations:
+            print(f"  - {violation}")
+    return 1 if invalid else 0
+
+
+def audit(args: argparse.Namespace, summary_out: TextIO) -> int:
     json_dir = Path(args.json_dir)
     existing = load_existing_weeks(json_dir)
     if not existing:
@@ -201,30 +495,126 @@ def main() -> int:
     for item in missing_ranges:
         print(f"- {item.label()}")
 
-    if not args.probe_week:
-        return 0
+    manifest = WeekManifest(args.json_dir, args.raw_json_dir)
+    incomplete: List[Tuple[WeekId, List[str]]] = []
+    unreadable: List[WeekId] = []
+    without_raw: List[WeekId] = []
+    for week_id in existing:
+        entry = manifest.entry(week_id.label())
+        if entry is None:
+            continue
+        if not entry.get("readable"):
+            unreadable.append(week_id)
+        elif entry.get("missing_days"):
+            incomplete.append((week_id, list(entry.get("missing_dates", []))))
+        if not entry.get("raw"):
+            without_raw.append(week_id)
+    coverage = None
+    if args.days or args.calendar:
+        coverage = DayCoverage.from_manifest(
+            manifest,
+            [week_id.label() for week_id in existing],
+            range_start.monday(),
+            range_end.monday() + timedelta(days=6),
+        )
+    manifest.save()
+
+    print(f"Incomplete weeks: {len(incomplete)}")
+    for week_id, missing_dates in incomplete:
+        print(f"- {week_id.label()}: {', '.join(missing_dates)}")
+    if unreadable:
+        print(f"Unreadable weeks: {len(unreadable)}")
+        for item in compress_ranges(unreadable):
+            print(f"- {item.label()}")
+    print(f"Weeks without raw JSON: {len(without_raw)}")
+    for item in compress_ranges(without_raw):
+        print(f"- {item.label()}")
+    if manifest.reparsed:
+        print(f"Manifest: re-read {manifest.reparsed} changed or new week file(s).")
+    if coverage is not None:
+        print_day_coverage(coverage, args.days, args.calendar)
 
-    requested = [parse_week_id(value) for value in args.probe_week]
-    session = requests.Session()
-    session.headers.update({"User-Agent": args.user_agent})
+    returncode = 0
+    if args.validate:
+        returncode = run_validation(args, existing)
 
-    for week_id in requested:
-        print(f"\nProbe {week_id.label()}")
-        failures = probe_week(
+    if not args.probe_week and not args.probe_all_missing:
+        return returncode
+
+    requested = [parse_week_id(value) for value in args.probe_week]
+    if args.probe_all_missing:
+        requested.extend(week_id for week_id in missing if week_id not in requested)
+    session = session_from_args(args)
+    cache = cache_from_args(args)
+    probe_cache = probe_cache_from_args(args)
+
+    # Explicit --probe-week days are downloaded so they also warm the daily cache.
+    explicit = set(parse_week_id(value) for value in args.probe_week)
+    results = probe_weeks(
+        session,
+        [week_id for week_id in requested if week_id in explicit],
+        args.project,
+        args.access,
+        args.timeout,
+        cache,
+        probe_cache,
+        full=True,
+        workers=args.probe_workers,
+    )
+    results.update(
+        probe_weeks(
             session,
-            week_id,
-            project=args.project,
-            access=args.access,
-            timeout=args.timeout,
+            [week_id for week_id in requested if week_id not in explicit],
+            args.project,
+            args.access,
+            args.timeout,
+            cache,
+            probe_cache,
+            full=False,
+            workers=args.probe_workers,
         )
+    )
+    if probe_cache is not None:
+        probe_cache.save()
+
+    for week_id in requested:
+        probes = results[week_id]
+        print(f"\nProbe {week_id.label()}: {classify_week(probes)}")
+        failures = [probe for probe in probes if not probe.ok]
         if not failures:
             print("- all 7 daily endpoints returned 2xx")
             continue
-        for day, status, detail in failures:
-            status_label = "request-error" if status == 0 else str(status)
-            print(f"- {day.isoformat()} -> {status_label}: {detail}")
+        for probe in failures:
+            status_label = "request-error" if probe.status == 0 else str(probe.status)
+            print(f"- {probe.day.isoformat()} -> {status_label}: {probe.detail}")
+
+    rows = summary_rows(results)
+    print(
+        "\nProbed weeks: "
+        + ", ".join(f"{status} {count}" for status, count in status_counts(rows).items())
+    )
+    if probe_cache is not None and probe_cache.hits:
+        print(f"Probe cache: {probe_cache.hits} day(s) answered without a request.")
+    if args.summary_format:
+        if args.summary_file == "-":
+            write_summary(rows, args.summary_format, summary_out)
+        else:
+            with open(args.summary_file, "w", encoding="utf-8", newline="") as handle:
+                write_summary(rows, args.summary_format, handle)
+            print(f"Probe summary written to {args.summary_file}")
+
+    print(f"\n{session.stats.summary()}")
+    return returncode
+
 
-    return 0
+def main() -> int:
+    args = parse_args()
+    summary_out = sys.stdout
+    if args.summary_format and args.summary_file == "-":
+        # The summary owns stdout so it can be piped; the report goes to stderr.
+        with contextlib.redirect_stdout(sys.stderr):
+            return audit(args, summary_out)
+    return audit(args, summary_out)
 
 
 if __name__ == "__main__":
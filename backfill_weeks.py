@@ -2,12 +2,30 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import json
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from http_transport import DEFAULT_POOL_SIZE, DEFAULT_REQUESTS_PER_SECOND
+from stage_metrics import EventLog, RunMetrics, collecting, latency_summary
+from week_manifest import WeekManifest
+
+COLLECTOR_SCRIPT = "wiki-get-top-weekly-pages.py"
+DEFAULT_TWO_PHASE_WEEKS = 52
+# Failures of one in-process week (enrichment giving up after its retries,
+# a broken connection, a full disk) that must not end the whole backfill.
+WEEK_ERRORS = (RuntimeError, requests.RequestException, OSError)
 
 
 def parse_args() -> argparse.Namespace:
@@ -51,7 +69,15 @@ def parse_args() -> argparse.Namespace:
         "--python",
         type=str,
         default=sys.executable,
-        help="Python executable used to run the weekly script",
+        help="Python executable used to run the weekly script with --subprocess",
+    )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help=(
+            "Run the weekly script as a separate process for each week instead of "
+            "calling it in-process over one shared HTTP session"
+        ),
     )
     parser.add_argument(
         "--json-dir",
@@ -81,12 +107,64 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print commands without executing them",
     )
+    parser.add_argument(
+        "--no-repair",
+        action="store_true",
+        help=(
+            "Rerun weeks with recorded missing days completely instead of "
+            "fetching only the missing days"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of weeks processed concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--max-requests-per-second",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help=(
+            "Global HTTP rate ceiling shared by all workers "
+            f"(default: {DEFAULT_REQUESTS_PER_SECOND:g})"
+        ),
+    )
+    parser.add_argument(
+        "--two-phase",
+        action="store_true",
+        help=(
+            "Rank all weeks first, then enrich the union of their titles once "
+            "and write every week (in-process only)"
+        ),
+    )
+    parser.add_argument(
+        "--two-phase-weeks",
+        type=int,
+        default=DEFAULT_TWO_PHASE_WEEKS,
+        help=(
+            "Weeks ranked before each shared enrichment in --two-phase mode "
+            f"(default: {DEFAULT_TWO_PHASE_WEEKS})"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-jsonl",
+        type=str,
+        default=None,
+        help=(
+            "Append stage, week and run metrics to this file as JSON lines "
+            "(stage metrics need the in-process mode)"
+        ),
+    )
     parser.add_argument(
         "--stop-on-error",
         action="store_true",
         help="Stop immediately if one week fails",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.two_phase and args.subprocess:
+        parser.error("--two-phase runs the weekly script in-process; drop --subprocess")
+    return args
 
 
 def resolve_start_date(start_year: Optional[int], start_week: Optional[int]) -> date:
@@ -106,10 +184,13 @@ def build_command(
     top: int,
     json_dir: str,
     raw_json_dir: str,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    repair: bool = False,
 ) -> list[str]:
-    return [
+    cmd = [
         python_bin,
-        "wiki-get-top-weekly-pages.py",
+        COLLECTOR_SCRIPT,
         "--exclude-stopwords",
         "--allow-missing-days",
         "--format",
@@ -124,7 +205,14 @@ def build_command(
         str(year),
         "--week",
         str(week),
+        "--max-requests-per-second",
+        f"{requests_per_second:g}",
+        "--pool-size",
+        str(pool_size),
     ]
+    if repair:
+        cmd.append("--repair-missing-days")
+    return cmd
 
 
 def load_json_file(path: Path) -> Optional[Dict[str, Any]]:
@@ -145,34 +233,489 @@ def extract_missing_days(data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]
     return [item for item in missing_days if isinstance(item, dict)]
 
 
-def existing_output_state(json_path: Path, raw_json_path: Path) -> List[str]:
-    if not json_path.exists() and not raw_json_path.exists():
+def existing_output_state(manifest: WeekManifest, week_key: str) -> List[str]:
+    entry = manifest.entry(week_key)
+    raw_exists = entry["raw"] if entry is not None else manifest.raw_week_path(week_key).exists()
+    if entry is None and not raw_exists:
         return []
 
     reasons: List[str] = []
 
-    if not json_path.exists():
+    if entry is None:
         reasons.append("missing enriched JSON")
-    if not raw_json_path.exists():
+    if not raw_exists:
         reasons.append("missing raw JSON")
 
-    if json_path.exists():
-        payload = load_json_file(json_path)
-        if payload is None:
+    if entry is not None:
+        if not entry.get("readable"):
             reasons.append("unreadable enriched JSON")
-        else:
-            missing_days = extract_missing_days(payload)
-            if missing_days:
-                reasons.append(f"{len(missing_days)} missing day(s) recorded")
+        elif entry.get("missing_days"):
+            reasons.append(f"{entry['missing_days']} missing day(s) recorded")
 
     return reasons
 
 
+def is_repairable(manifest: WeekManifest, week_key: str) -> bool:
+    # Only recorded missing days are wrong: they can be fetched and merged in.
+    entry = manifest.entry(week_key)
+    return bool(
+        entry is not None
+        and entry.get("readable")
+        and entry.get("raw")
+        and entry.get("missing_days")
+    )
+
+
 def write_report(path: Path, report: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
 
 
+def build_report(
+    total: int,
+    skipped: int,
+    retried: int,
+    failed_weeks: List[Dict[str, Any]],
+    incomplete_weeks: List[Dict[str, Any]],
+    retried_weeks: List[Dict[str, Any]],
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "executed": total,
+        "skipped": skipped,
+        "retried": retried,
+        "failed_weeks": failed_weeks,
+        "incomplete_weeks": incomplete_weeks,
+        "retried_weeks": retried_weeks,
+    }
+    if metrics is not None:
+        report["metrics"] = metrics
+    return report
+
+
+def build_metrics(
+    planned: List[PlannedWeek],
+    outcomes: Dict[int, WeekOutcome],
+    shared: RunMetrics,
+    transport: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    total = RunMetrics("run")
+    total.merge(shared)
+    weeks: Dict[str, Any] = {}
+    for index, item in enumerate(planned):
+        outcome = outcomes.get(index)
+        if outcome is None:
+            continue
+        week: Dict[str, Any] = {"seconds": round(outcome.seconds, 3)}
+        if outcome.metrics is not None:
+            total.merge(outcome.metrics)
+            week["stages"] = outcome.metrics.as_dict(percentiles=False)
+        weeks[item.week_key] = week
+    metrics: Dict[str, Any] = {
+        "week_seconds": latency_summary([week["seconds"] for week in weeks.values()]),
+        "stages": total.as_dict(),
+        "weeks": weeks,
+    }
+    if transport is not None:
+        metrics["transport"] = transport
+    return metrics
+
+
+def load_collector() -> ModuleType:
+    path = Path(__file__).resolve().parent / COLLECTOR_SCRIPT
+    spec = importlib.util.spec_from_file_location("weekly_collector", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class WeekOutcome:
+    returncode: int
+    payload: Optional[Dict[str, Any]] = None
+    error: str = ""
+    seconds: float = 0.0
+    metrics: Optional[RunMetrics] = None
+
+
+class SubprocessRunner:
+    def run(
+        self,
+        cmd: List[str],
+        output_path: Path,
+        raw_output_path: Path,
+        metrics: Optional[RunMetrics] = None,
+    ) -> WeekOutcome:
+        result = subprocess.run(cmd, check=False)
+        if result.returncode != 0:
+            return WeekOutcome(result.returncode)
+        if not output_path.exists() or not raw_output_path.exists():
+            return WeekOutcome(
+                0, error="collector exited successfully but did not write both JSON files"
+            )
+        payload = load_json_file(output_path)
+        if payload is None:
+            return WeekOutcome(0, error="collector wrote unreadable enriched JSON")
+        return WeekOutcome(0, payload)
+
+    def transport_stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessRunner:
+    def __init__(self) -> None:
+        self.collector = load_collector()
+        self._lock = threading.Lock()
+        self.session = None
+        self.cache = None
+        self.archive = None
+        self.store = None
+
+    def week_args(self, cmd: List[str]) -> argparse.Namespace:
+        week_args = self.collector.parse_args(cmd[2:])
+        with self._lock:
+            if self.session is None:
+                # One session, cache and metadata store for the whole backfill;
+                # the session's token bucket is the rate ceiling for all workers.
+                self.session = self.collector.session_from_args(week_args)
+                self.cache = self.collector.cache_from_args(week_args)
+                self.archive = self.collector.daily_store_from_args(week_args)
+                self.store = self.collector.metadata_store_from_args(week_args)
+        return week_args
+
+    def outcome(
+        self,
+        payload: Optional[Dict[str, Any]],
+        status: Any,
+        output_path: Path,
+        raw_output_path: Path,
+    ) -> WeekOutcome:
+        if not status.ok:
+            return WeekOutcome(status.returncode, error=status.error)
+        if not output_path.exists() or not raw_output_path.exists():
+            return WeekOutcome(
+                0, error="collector finished successfully but did not write both JSON files"
+            )
+        return WeekOutcome(0, payload)
+
+    def run(
+        self,
+        cmd: List[str],
+        output_path: Path,
+        raw_output_path: Path,
+        metrics: Optional[RunMetrics] = None,
+    ) -> WeekOutcome:
+        week_args = self.week_args(cmd)
+        try:
+            with collecting(metrics):
+                payload, _, status = self.collector.collect_week(
+                    week_args, self.session, self.cache, self.archive, self.store
+                )
+        except WEEK_ERRORS as exc:
+            return WeekOutcome(1, error=str(exc))
+        return self.outcome(payload, status, output_path, raw_output_path)
+
+    def prepare(
+        self,
+        cmd: List[str],
+        output_path: Path,
+        raw_output_path: Path,
+        metrics: Optional[RunMetrics] = None,
+    ) -> Any:
+        # Returns a prepared week waiting for enrichment, or the final outcome.
+        week_args = self.week_args(cmd)
+        if week_args.repair_missing_days:
+            return self.run(cmd, output_path, raw_output_path, metrics)
+        try:
+            with collecting(metrics):
+                prepared, status = self.collector.prepare_week(
+                    week_args, self.session, self.cache, self.archive
+                )
+        except WEEK_ERRORS as exc:
+            return WeekOutcome(1, error=str(exc))
+        if prepared is None:
+            return WeekOutcome(status.returncode, error=status.error)
+        prepared.release_aggregate()
+        return prepared
+
+    def finish(
+        self,
+        prepared_weeks: Dict[int, Any],
+        planned: List[PlannedWeek],
+        week_metrics: Dict[int, RunMetrics],
+        shared: RunMetrics,
+    ) -> Dict[int, WeekOutcome]:
+        outcomes: Dict[int, WeekOutcome] = {}
+        projects = dict.fromkeys(week.args.project for week in prepared_weeks.values())
+        for project in projects:
+            indexes = [
+                index
+                for index, week in prepared_weeks.items()
+                if week.args.project == project
+            ]
+            titles = [
+                str(item["article"])
+                for index in indexes
+                for item in prepared_weeks[index].to_enrich
+            ]
+            week_args = prepared_weeks[indexes[0]].args
+            print(
+                f"Shared enrichment: {len(set(titles))} unique title(s) "
+                f"for {len(indexes)} week(s) of {project}."
+            )
+            try:
+                with collecting(shared):
+                    enrichment = self.collector.fetch_enrichment(
+                        self.session,
+                        project,
+                        titles,
+                        week_args.thumbsize,
+                        week_args.timeout,
+                        self.store,
+                        max_in_flight=week_args.enrichment_concurrency,
+                        separate_requests=week_args.separate_metadata_requests,
+                    )
+            except WEEK_ERRORS as exc:
+                # Every week of the chunk was waiting for this enrichment.
+                for index in indexes:
+                    outcomes[index] = WeekOutcome(1, error=str(exc))
+                continue
+            for index in indexes:
+                week = prepared_weeks[index]
+                started = time.perf_counter()
+                try:
+                    with collecting(week_metrics.get(index)):
+                        self.collector.apply_enrichment(
+                            week.args,
+                            week.to_enrich,
+                            week.days,
+                            week.daily_views,
+                            week.start_date,
+                            week.end_date,
+                            *enrichment,
+                        )
+                        payload, _, status = self.collector.write_prepared_week(
+                            week, self.collector.CollectStatus()
+                        )
+                except WEEK_ERRORS as exc:
+                    outcomes[index] = WeekOutcome(1, error=str(exc))
+                else:
+                    outcomes[index] = self.outcome(
+                        payload,
+                        status,
+                        planned[index].output_path,
+                        planned[index].raw_output_path,
+                    )
+                outcomes[index].seconds = time.perf_counter() - started
+        return outcomes
+
+    def transport_stats(self) -> Optional[Dict[str, Any]]:
+        if self.session is None:
+            return None
+        return self.session.stats.as_dict()
+
+    def close(self) -> None:
+        if self.store is not None:
+            print(self.store.summary(), file=sys.stderr)
+            self.store.close()
+        if self.session is not None:
+            print(self.session.stats.summary(), file=sys.stderr)
+
+
+Runner = Union[SubprocessRunner, InProcessRunner]
+
+
+@dataclass
+class PlannedWeek:
+    year: int
+    week: int
+    cmd: List[str]
+    output_path: Path
+    raw_output_path: Path
+
+    @property
+    def week_id(self) -> str:
+        return f"{self.year}-W{self.week:02d}"
+
+    @property
+    def week_key(self) -> str:
+        return f"{self.year}-{self.week:02d}"
+
+
+def is_failure(outcome: WeekOutcome) -> bool:
+    return outcome.returncode != 0 or bool(outcome.error)
+
+
+def week_status(outcome: WeekOutcome) -> str:
+    if is_failure(outcome):
+        return "failed"
+    return "incomplete" if extract_missing_days(outcome.payload) else "complete"
+
+
+def emit_week(events: Optional[EventLog], planned: PlannedWeek, outcome: WeekOutcome) -> None:
+    if events is None:
+        return
+    events.emit(
+        "week",
+        week=planned.week_key,
+        status=week_status(outcome),
+        seconds=round(outcome.seconds, 3),
+        stages=outcome.metrics.as_dict(percentiles=False) if outcome.metrics else {},
+    )
+
+
+def run_planned_week(
+    runner: Runner, number: int, planned: PlannedWeek, events: Optional[EventLog] = None
+) -> WeekOutcome:
+    print(f"[{number}] {planned.week_id}: {' '.join(planned.cmd)}")
+    metrics = RunMetrics(planned.week_key, events)
+    started = time.perf_counter()
+    outcome = runner.run(planned.cmd, planned.output_path, planned.raw_output_path, metrics)
+    outcome.seconds = time.perf_counter() - started
+    if isinstance(runner, InProcessRunner):
+        outcome.metrics = metrics
+    report_failure(planned, outcome)
+    emit_week(events, planned, outcome)
+    return outcome
+
+
+def report_failure(planned: PlannedWeek, outcome: WeekOutcome) -> None:
+    if outcome.returncode != 0:
+        detail = f": {outcome.error}" if outcome.error else ""
+        print(
+            f"Failed week {planned.week_id} (exit {outcome.returncode}){detail}",
+            file=sys.stderr,
+        )
+    elif outcome.error:
+        print(f"Failed week {planned.week_id}: {outcome.error}.", file=sys.stderr)
+
+
+def run_weeks(
+    runner: Runner,
+    planned: List[PlannedWeek],
+    workers: int,
+    stop_on_error: bool,
+    events: Optional[EventLog] = None,
+    outcomes: Optional[Dict[int, WeekOutcome]] = None,
+) -> Dict[int, WeekOutcome]:
+    # Filled in place, so the caller keeps finished weeks if the run is interrupted.
+    outcomes = {} if outcomes is None else outcomes
+    if workers <= 1:
+        for index, item in enumerate(planned):
+            outcomes[index] = run_planned_week(runner, index + 1, item, events)
+            if stop_on_error and is_failure(outcomes[index]):
+                break
+        return outcomes
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_planned_week, runner, index + 1, item, events): index
+            for index, item in enumerate(planned)
+        }
+        for future in as_completed(futures):
+            outcomes[futures[future]] = future.result()
+            if stop_on_error and is_failure(outcomes[futures[future]]):
+                for pending in futures:
+                    pending.cancel()
+                break
+    # Weeks already running when a stop was requested still finished.
+    for future, index in futures.items():
+        if index not in outcomes and future.done() and not future.cancelled():
+            outcomes[index] = future.result()
+    return outcomes
+
+
+def run_weeks_two_phase(
+    runner: InProcessRunner,
+    planned: List[PlannedWeek],
+    workers: int,
+    stop_on_error: bool,
+    chunk_weeks: int,
+    shared: RunMetrics,
+    events: Optional[EventLog] = None,
+    outcomes: Optional[Dict[int, WeekOutcome]] = None,
+) -> Dict[int, WeekOutcome]:
+    outcomes = {} if outcomes is None else outcomes
+    chunk_weeks = max(1, chunk_weeks)
+    week_metrics = {
+        index: RunMetrics(item.week_key, events) for index, item in enumerate(planned)
+    }
+    prepare_seconds: Dict[int, float] = {}
+
+    def prepare(index: int) -> Any:
+        item = planned[index]
+        print(f"[{index + 1}] {item.week_id}: {' '.join(item.cmd)}")
+        started = time.perf_counter()
+        result = runner.prepare(
+            item.cmd, item.output_path, item.raw_output_path, week_metrics[index]
+        )
+        prepare_seconds[index] = time.perf_counter() - started
+        return result
+
+    for chunk_start in range(0, len(planned), chunk_weeks):
+        indexes = range(chunk_start, min(chunk_start + chunk_weeks, len(planned)))
+        # Phase 1: fetch, aggregate and rank every week of the chunk.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(indexes, executor.map(prepare, indexes)))
+        prepared_weeks: Dict[int, Any] = {}
+        for index, result in results.items():
+            if isinstance(result, WeekOutcome):
+                outcomes[index] = result
+                report_failure(planned[index], result)
+            else:
+                prepared_weeks[index] = result
+        # Phase 2: enrich the union of titles once and write every week.
+        if prepared_weeks:
+            outcomes.update(
+                runner.finish(prepared_weeks, planned, week_metrics, shared)
+            )
+        # Week times leave out the shared enrichment, which is reported apart.
+        for index in indexes:
+            outcome = outcomes[index]
+            outcome.seconds += prepare_seconds[index]
+            outcome.metrics = week_metrics[index]
+            if index in prepared_weeks:
+                report_failure(planned[index], outcome)
+            emit_week(events, planned[index], outcome)
+        if stop_on_error and any(is_failure(outcomes[index]) for index in indexes):
+            break
+    return outcomes
+
+
+def summarize_outcomes(
+    planned: List[PlannedWeek], outcomes: Dict[int, WeekOutcome]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    # The report follows the planned (newest first) order, not completion order.
+    failed_weeks: List[Dict[str, Any]] = []
+    incomplete_weeks: List[Dict[str, Any]] = []
+    first_returncode = 0
+    for index, item in enumerate(planned):
+        outcome = outcomes.get(index)
+        if outcome is None:
+            continue
+        if is_failure(outcome):
+            failed_week: Dict[str, Any] = {
+                "week": item.week_key,
+                "returncode": outcome.returncode,
+            }
+            if outcome.error:
+                failed_week["error"] = outcome.error
+            failed_weeks.append(failed_week)
+            first_returncode = first_returncode or outcome.returncode or 1
+            continue
+        missing_days = extract_missing_days(outcome.payload)
+        if missing_days:
+            incomplete_weeks.append({"week": item.week_key, "missing_days": missing_days})
+    return failed_weeks, incomplete_weeks, first_returncode
+
+
 def main() -> int:
     args = parse_args()
     try:
@@ -181,14 +724,21 @@ def main() -> int:
         print(str(exc), file=sys.stderr)
         return 2
 
-    failures = 0
-    total = 0
+    workers = max(1, args.workers)
+    if args.subprocess:
+        # Every process has its own limiter, so the ceiling is split between them.
+        requests_per_second = args.max_requests_per_second / workers
+        pool_size = DEFAULT_POOL_SIZE
+    else:
+        requests_per_second = args.max_requests_per_second
+        pool_size = DEFAULT_POOL_SIZE * workers
+
     skipped = 0
     retried = 0
     visited = 0
-    failed_weeks: List[Dict[str, Any]] = []
-    incomplete_weeks: List[Dict[str, Any]] = []
+    planned: List[PlannedWeek] = []
     retried_weeks: List[Dict[str, Any]] = []
+    manifest = WeekManifest(args.json_dir, args.raw_json_dir)
 
     while current.isocalendar().year >= args.min_year:
         if args.max_weeks is not None and visited >= args.max_weeks:
@@ -198,18 +748,20 @@ def main() -> int:
         week_id = f"{year}-W{week:02d}"
         output_path = Path(args.json_dir) / f"{year}-{week:02d}.json"
         raw_output_path = Path(args.raw_json_dir) / f"{year}-{week:02d}.json"
-        retry_reasons = existing_output_state(output_path, raw_output_path)
+        retry_reasons = existing_output_state(manifest, f"{year}-{week:02d}")
+        current = current - timedelta(days=7)
 
         if output_path.exists() and not args.force_rewrite and not retry_reasons:
             skipped += 1
             print(f"[skip] {week_id}: found {output_path}")
-            current = current - timedelta(days=7)
             continue
 
+        repair = False
         if retry_reasons and not args.force_rewrite:
             retried += 1
             retried_weeks.append({"week": f"{year}-{week:02d}", "reasons": retry_reasons})
             print(f"[retry] {week_id}: " + ", ".join(retry_reasons))
+            repair = not args.no_repair and is_repairable(manifest, f"{year}-{week:02d}")
 
         cmd = build_command(
             args.python,
@@ -218,125 +770,94 @@ def main() -> int:
             args.top,
             args.json_dir,
             args.raw_json_dir,
+            requests_per_second,
+            pool_size,
+            repair,
         )
-        total += 1
-        print(f"[{total}] {week_id}: {' '.join(cmd)}")
-
-        if not args.dry_run:
-            result = subprocess.run(cmd, check=False)
-            if result.returncode != 0:
-                failures += 1
-                failed_weeks.append(
-                    {
-                        "week": f"{year}-{week:02d}",
-                        "returncode": result.returncode,
-                    }
-                )
-                print(
-                    f"Failed week {week_id} (exit {result.returncode})",
-                    file=sys.stderr,
-                )
-                if args.stop_on_error:
-                    report = {
-                        "generated_at": datetime.now(timezone.utc).isoformat(),
-                        "executed": total,
-                        "skipped": skipped,
-                        "retried": retried,
-                        "failed_weeks": failed_weeks,
-                        "incomplete_weeks": incomplete_weeks,
-                        "retried_weeks": retried_weeks,
-                    }
-                    write_report(Path(args.report_file), report)
-                    return result.returncode
-            else:
-                if not output_path.exists() or not raw_output_path.exists():
-                    failures += 1
-                    failed_weeks.append(
-                        {
-                            "week": f"{year}-{week:02d}",
-                            "returncode": result.returncode,
-                            "error": "collector exited successfully but did not write both JSON files",
-                        }
-                    )
-                    print(
-                        f"Failed week {week_id}: missing output artifact after successful run.",
-                        file=sys.stderr,
-                    )
-                    if args.stop_on_error:
-                        report = {
-                            "generated_at": datetime.now(timezone.utc).isoformat(),
-                            "executed": total,
-                            "skipped": skipped,
-                            "retried": retried,
-                            "failed_weeks": failed_weeks,
-                            "incomplete_weeks": incomplete_weeks,
-                            "retried_weeks": retried_weeks,
-                        }
-                        write_report(Path(args.report_file), report)
-                        return 1
-                    current = current - timedelta(days=7)
-                    continue
-                payload = load_json_file(output_path)
-                if payload is None:
-                    failures += 1
-                    failed_weeks.append(
-                        {
-                            "week": f"{year}-{week:02d}",
-                            "returncode": result.returncode,
-                            "error": "collector wrote unreadable enriched JSON",
-                        }
-                    )
-                    print(
-                        f"Failed week {week_id}: unreadable enriched JSON after run.",
-                        file=sys.stderr,
-                    )
-                    if args.stop_on_error:
-                        report = {
-                            "generated_at": datetime.now(timezone.utc).isoformat(),
-                            "executed": total,
-                            "skipped": skipped,
-                            "retried": retried,
-                            "failed_weeks": failed_weeks,
-                            "incomplete_weeks": incomplete_weeks,
-                            "retried_weeks": retried_weeks,
-                        }
-                        write_report(Path(args.report_file), report)
-                        return 1
-                    current = current - timedelta(days=7)
-                    continue
-                missing_days = extract_missing_days(payload)
-                if missing_days:
-                    incomplete_weeks.append(
-                        {
-                            "week": f"{year}-{week:02d}",
-                            "missing_days": missing_days,
-                        }
-                    )
-
-        current = current - timedelta(days=7)
+        planned.append(PlannedWeek(year, week, cmd, output_path, raw_output_path))
+        if args.dry_run:
+            print(f"[{len(planned)}] {week_id}: {' '.join(cmd)}")
 
-    report = {
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "executed": total,
-        "skipped": skipped,
-        "retried": retried,
-        "failed_weeks": failed_weeks,
-        "incomplete_weeks": incomplete_weeks,
-        "retried_weeks": retried_weeks,
-    }
+    # Saved before running: the collector records the weeks it writes itself.
     if not args.dry_run:
-        write_report(Path(args.report_file), report)
+        manifest.save()
+    if manifest.reparsed:
+        print(f"Manifest: re-read {manifest.reparsed} changed or new week file(s).")
+
+    if args.dry_run:
+        print(
+            "Completed successfully. "
+            f"Executed: {len(planned)}, skipped: {skipped}, retried: {retried}, "
+            "incomplete weeks: 0."
+        )
+        return 0
 
-    if failures:
+    events = EventLog(args.metrics_jsonl) if args.metrics_jsonl else None
+    shared = RunMetrics("shared", events)
+    runner = SubprocessRunner() if args.subprocess else InProcessRunner()
+    outcomes: Dict[int, WeekOutcome] = {}
+    started = time.perf_counter()
+    try:
+        try:
+            if args.two_phase:
+                run_weeks_two_phase(
+                    runner,
+                    planned,
+                    workers,
+                    args.stop_on_error,
+                    args.two_phase_weeks,
+                    shared,
+                    events,
+                    outcomes,
+                )
+            else:
+                run_weeks(
+                    runner, planned, workers, args.stop_on_error, events, outcomes
+                )
+        finally:
+            runner.close()
+    finally:
+        # Written even when the run is interrupted, for the weeks that finished.
+        elapsed = time.perf_counter() - started
+        failed_weeks, incomplete_weeks, first_returncode = summarize_outcomes(
+            planned, outcomes
+        )
+        metrics = build_metrics(planned, outcomes, shared, runner.transport_stats())
+        metrics["seconds"] = round(elapsed, 3)
+        report = build_report(
+            len(outcomes),
+            skipped,
+            retried,
+            failed_weeks,
+            incomplete_weeks,
+            retried_weeks,
+            metrics,
+        )
+        write_report(Path(args.report_file), report)
+        if events is not None:
+            events.emit(
+                "run",
+                seconds=metrics["seconds"],
+                executed=len(outcomes),
+                failed=len(failed_weeks),
+                incomplete=len(incomplete_weeks),
+                stages=metrics["stages"],
+                transport=metrics.get("transport"),
+            )
+            events.close()
+
+    if failed_weeks and args.stop_on_error:
+        return first_returncode
+    if failed_weeks:
         print(
-            f"Completed with {failures} failures and {len(incomplete_weeks)} incomplete week(s).",
+            f"Completed with {len(failed_weeks)} failures and {len(incomplete_weeks)} incomplete week(s).",
             file=sys.stderr,
         )
         return 1
 
     print(
         "Completed successfully. "
-        f"Executed: {total}, skipped: {skipped}, retried: {retried}, "
+        f"Executed: {len(outcomes)}, skipped: {skipped}, retried: {retried}, "
         f"incomplete weeks: {len(incomplete_weeks)}."
     )
     return 0
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Build manifest of rendered outputs, their input hashes and renderer versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUILD_MANIFEST = ".cache/build-manifest.json"
+BUILD_MANIFEST_VERSION = 1
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: Path) -> Optional[str]:
+    try:
+        return content_hash(path.read_bytes())
+    except OSError:
+        return None
+
+
+def renderer_version(*sources: str) -> str:
+    # Templates live in the renderer modules, so their source is the version.
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(Path(source).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def inputs_key(inputs: Dict[str, str], renderer: str) -> Tuple[str, str]:
+    return json.dumps(inputs, sort_keys=True), renderer
+
+
+class BuildManifest:
+    def __init__(self, path: str = DEFAULT_BUILD_MANIFEST) -> None:
+        self.path = Path(path)
+        self.outputs: Dict[str, Dict[str, object]] = {}
+        self.dirty = False
+        self._by_inputs: Dict[Tuple[str, str], List[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != BUILD_MANIFEST_VERSION:
+            return
+        outputs = data.get("outputs")
+        if isinstance(outputs, dict):
+            for output, entry in outputs.items():
+                if isinstance(entry, dict) and isinstance(entry.get("inputs"), dict):
+                    self._add(str(output), entry)
+
+    def _add(self, output: str, entry: Dict[str, object]) -> None:
+        self.forget(output)
+        self.outputs[output] = entry
+        key = inputs_key(entry["inputs"], str(entry.get("renderer")))
+        self._by_inputs.setdefault(key, []).append(output)
+
+    def forget(self, output: str) -> None:
+        entry = self.outputs.pop(output, None)
+        if entry is None:
+            return
+        key = inputs_key(entry["inputs"], str(entry.get("renderer")))
+        outputs = self._by_inputs.get(key, [])
+        if output in outputs:
+            outputs.remove(output)
+        self.dirty = True
+
+    def is_current(self, output: str, inputs: Dict[str, str], renderer: str) -> bool:
+        entry = self.outputs.get(output)
+        if entry is None or entry.get("renderer") != renderer or entry.get("inputs") != inputs:
+            return False
+        try:
+            stat = Path(output).stat()
+        except OSError:
+            return False
+        if [stat.st_size, stat.st_mtime_ns] == entry.get("stat"):
+            return True
+        # Touched or edited by hand: only an identical file is still current.
+        return file_hash(Path(output)) == entry.get("sha256")
+
+    def current_output(self, inputs: Dict[str, str], renderer: str) -> Optional[str]:
+        for output in self._by_inputs.get(inputs_key(inputs, renderer), []):
+            if self.is_current(output, inputs, renderer):
+                return output
+        return None
+
+    def record(self, output: str, inputs: Dict[str, str], renderer: str) -> None:
+        path = Path(output)
+        stat = path.stat()
+        self._add(
+            output,
+            {
+                "inputs": dict(inputs),
+                "renderer": renderer,
+                "sha256": file_hash(path),
+                "stat": [stat.st_size, stat.st_mtime_ns],
+            },
+        )
+        self.dirty = True
+
+    def orphans(self, directories: Iterable[str]) -> List[str]:
+        # Generated outputs in these directories whose input files are gone.
+        roots = [Path(directory).resolve() for directory in directories]
+        found: List[str] = []
+        for output, entry in self.outputs.items():
+            parent = Path(output).resolve().parent
+            if parent not in roots:
+                continue
+            if entry["inputs"] and not any(Path(name).is_file() for name in entry["inputs"]):
+                found.append(output)
+        return sorted(found)
+
+    def prune(self, directories: Iterable[str]) -> List[str]:
+        removed: List[str] = []
+        for output in self.orphans(directories):
+            try:
+                Path(output).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            self.forget(output)
+            removed.append(output)
+        return removed
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {"version": BUILD_MANIFEST_VERSION, "outputs": dict(sorted(self.outputs.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def add_build_manifest_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only regenerate outputs whose input JSON or renderer changed since "
+            "they were recorded in the build manifest"
+        ),
+    )
+    parser.add_argument(
+        "--build-manifest",
+        type=str,
+        default=DEFAULT_BUILD_MANIFEST,
+        help=(
+            "Manifest of rendered outputs with input hashes and renderer "
+            f"versions (default: {DEFAULT_BUILD_MANIFEST})"
+        ),
+    )
+
+
+def build_manifest_from_args(args: argparse.Namespace) -> BuildManifest:
+    return BuildManifest(args.build_manifest)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Archive of untouched daily pageviews/top article lists.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_DAILY_DIR = "docs/rawdaily"
+
+
+class DailyStore:
+    def __init__(self, directory: str = DEFAULT_DAILY_DIR) -> None:
+        self.directory = Path(directory)
+
+    def path_for(self, project: str, access: str, day: date) -> Path:
+        return (
+            self.directory
+            / project
+            / access
+            / f"{day.year:04d}"
+            / f"{day.isoformat()}.json.gz"
+        )
+
+    def load(self, project: str, access: str, day: date) -> Optional[List[Dict[str, object]]]:
+        path = self.path_for(project, access, day)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        articles = payload.get("articles") if isinstance(payload, dict) else None
+        if not isinstance(articles, list):
+            return None
+        return articles
+
+    def save(
+        self, project: str, access: str, day: date, articles: List[Dict[str, object]]
+    ) -> None:
+        path = self.path_for(project, access, day)
+        payload = {
+            "project": project,
+            "access": access,
+            "date": day.isoformat(),
+            "articles": articles,
+        }
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        # Best effort: a day that cannot be archived is still returned to the caller.
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as raw_handle:
+                with gzip.GzipFile(
+                    filename="", mode="wb", fileobj=raw_handle, compresslevel=9, mtime=0
+                ) as handle:
+                    handle.write(data)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            print(f"Warning: cannot archive {path}: {exc}", file=sys.stderr)
+
+
+def add_daily_store_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--daily-dir",
+        type=str,
+        default=DEFAULT_DAILY_DIR,
+        help=(
+            "Archive of raw daily top lists, one gzip JSON file per project, "
+            f"access and day (default: {DEFAULT_DAILY_DIR})"
+        ),
+    )
+    parser.add_argument(
+        "--no-daily-archive",
+        action="store_true",
+        help="Do not read or write the raw daily archive",
+    )
+
+
+def daily_store_from_args(args: argparse.Namespace) -> Optional[DailyStore]:
+    if args.no_daily_archive:
+        return None
+    return DailyStore(args.daily_dir)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Day-level coverage of the weekly corpus, built from the week manifest.
+"""
+
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from week_manifest import WeekManifest
+
+STATUS_PRESENT = "present"
+STATUS_NOT_FOUND = "404"
+STATUS_REQUEST_ERROR = "request-error"
+STATUS_PENDING = "pending"
+STATUS_NO_WEEK = "no-week"
+DAY_STATUSES = (
+    STATUS_PRESENT,
+    STATUS_NOT_FOUND,
+    STATUS_REQUEST_ERROR,
+    STATUS_PENDING,
+    STATUS_NO_WEEK,
+)
+CALENDAR_SYMBOLS = {
+    STATUS_PRESENT: "#",
+    STATUS_NOT_FOUND: "x",
+    STATUS_REQUEST_ERROR: "!",
+    STATUS_PENDING: "?",
+    STATUS_NO_WEEK: ".",
+}
+
+DayRange = Tuple[date, date, str]
+
+
+def day_status(recorded: object) -> str:
+    # 5xx answers and connection failures are both worth another request.
+    value = str(recorded)
+    if value in (STATUS_NOT_FOUND, STATUS_PENDING):
+        return value
+    return STATUS_REQUEST_ERROR
+
+
+class DayCoverage:
+    def __init__(self, start: date, end: date) -> None:
+        self.start = start
+        self.end = end
+        self.statuses: Dict[date, str] = {}
+
+    @classmethod
+    def from_manifest(
+        cls, manifest: WeekManifest, week_keys: Iterable[str], start: date, end: date
+    ) -> "DayCoverage":
+        # Entries are only re-read from disk for week files that changed.
+        coverage = cls(start, end)
+        for week_key in week_keys:
+            entry = manifest.entry(week_key)
+            if entry is None or not entry.get("readable"):
+                continue
+            year, week = (int(part) for part in week_key.split("-"))
+            coverage.add_week(year, week, entry.get("missing_status", {}))
+        return coverage
+
+    def add_week(self, year: int, week: int, missing_status: Dict[str, object]) -> None:
+        monday = date.fromisocalendar(year, week, 1)
+        for offset in range(7):
+            day = monday + timedelta(days=offset)
+            recorded = missing_status.get(day.isoformat())
+            self.statuses[day] = STATUS_PRESENT if recorded is None else day_status(recorded)
+
+    def status(self, day: date) -> str:
+        return self.statuses.get(day, STATUS_NO_WEEK)
+
+    def days(self) -> Iterable[date]:
+        current = self.start
+        while current <= self.end:
+            yield current
+            current += timedelta(days=1)
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(DAY_STATUSES, 0)
+        for day in self.days():
+            counts[self.status(day)] += 1
+        return counts
+
+    def ranges(self) -> List[DayRange]:
+        # Runs of consecutive days sharing a status other than present.
+        ranges: List[DayRange] = []
+        for day in self.days():
+            status = self.status(day)
+            if ranges and ranges[-1][2] == status and ranges[-1][1] == day - timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day, status)
+            else:
+                ranges.append((day, day, status))
+        return [item for item in ranges if item[2] != STATUS_PRESENT]
+
+    def calendar(self) -> List[str]:
+        # One row per month, one column per day of the month.
+        header = "        " + "".join(str(day % 10) for day in range(1, 32))
+        lines = [header]
+        year, month = self.start.year, self.start.month
+        while (year, month) <= (self.end.year, self.end.month):
+            cells = []
+            for day_number in range(1, calendar.monthrange(year, month)[1] + 1):
+                day = date(year, month, day_number)
+                if day < self.start or day > self.end:
+                    cells.append(" ")
+                else:
+                    cells.append(CALENDAR_SYMBOLS[self.status(day)])
+            lines.append(f"{year}-{month:02d} " + "".join(cells))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return lines
+
+
+def format_day_range(item: DayRange) -> str:
+    start, end, status = item
+    if start == end:
+        return f"{start.isoformat()}: {status}"
+    days = (end - start).days + 1
+    return f"{start.isoformat()} -> {end.isoformat()}: {status} ({days} days)"
+
+
+def calendar_legend() -> str:
+    return "  ".join(f"{symbol} {status}" for status, symbol in CALENDAR_SYMBOLS.items())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport with rate limiting and retries for Wikimedia APIs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from stage_metrics import record_request
+
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_POOL_SIZE = 16
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.target_rate = rate
+        self.min_rate = min(rate, 0.5)
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiters = 0
+        self._waiting_since = 0.0
+
+    def acquire(self) -> float:
+        # Returns wall time during which at least one caller was held back,
+        # counted once however many threads were waiting together.
+        if self.rate <= 0:
+            return 0.0
+        waiting = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    if not waiting:
+                        return 0.0
+                    self._waiters -= 1
+                    return 0.0 if self._waiters else now - self._waiting_since
+                delay = (1.0 - self._tokens) / self.rate
+                if not waiting:
+                    waiting = True
+                    if not self._waiters:
+                        self._waiting_since = now
+                    self._waiters += 1
+            time.sleep(delay)
+
+    def slow_down(self) -> None:
+        with self._lock:
+            if self.rate > 0:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        with self._lock:
+            if 0 < self.rate < self.target_rate:
+                self.rate = min(self.target_rate, self.rate * 1.1)
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0
+    retries: int = 0
+    bytes: int = 0
+    throttled_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **values: float) -> None:
+        with self._lock:
+            for name, value in values.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "bytes": self.bytes,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "backoff_seconds": round(self.backoff_seconds, 3),
+            }
+
+    def summary(self) -> str:
+        data = self.as_dict()
+        return (
+            f"HTTP: {data['requests']} request(s), {data['retries']} retr(y/ies), "
+            f"{data['throttled_seconds']:.1f}s rate-limited, "
+            f"{data['backoff_seconds']:.1f}s backing off."
+        )
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class ThrottledSession(requests.Session):
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+    ) -> None:
+        super().__init__()
+        self.bucket = TokenBucket(requests_per_second)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = TransportStats()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def backoff_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, method, url, *args, **kwargs):  # type: ignore[override]
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            waited = self.bucket.acquire()
+            self.stats.add(requests=1, throttled_seconds=waited)
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    record_request(time.perf_counter() - started, 0, attempt)
+                    raise
+                response = None
+            else:
+                if response.status_code == 429:
+                    self.bucket.slow_down()
+                elif response.status_code < 400:
+                    self.bucket.recover()
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    size = 0 if kwargs.get("stream") else len(response.content)
+                    self.stats.add(bytes=size)
+                    record_request(time.perf_counter() - started, size, attempt)
+                    return response
+
+            delay = self.backoff_delay(attempt, response)
+            self.stats.add(retries=1, backoff_seconds=delay)
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+
+def build_session(
+    user_agent: str,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    pool_size: int = DEFAULT_POOL_SIZE,
+) -> ThrottledSession:
+    session = ThrottledSession(
+        requests_per_second=requests_per_second,
+        max_retries=max_retries,
+        pool_size=pool_size,
+    )
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+def add_transport_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--max-requests-per-second",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help=(
+            "Rate limit shared by all HTTP requests, 0 disables it "
+            f"(default: {DEFAULT_REQUESTS_PER_SECOND:g})"
+        ),
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=(
+            "Retries for 429/5xx responses and connection errors, with "
+            f"exponential backoff and Retry-After support (default: {DEFAULT_MAX_RETRIES})"
+        ),
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help=f"HTTP connection pool size per host (default: {DEFAULT_POOL_SIZE})",
+    )
+
+
+def session_from_args(args: argparse.Namespace) -> ThrottledSession:
+    return build_session(
+        args.user_agent,
+        requests_per_second=args.max_requests_per_second,
+        max_retries=args.max_retries,
+        pool_size=args.pool_size,
+    )
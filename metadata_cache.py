@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed cache for MediaWiki and Commons enrichment metadata.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from stage_metrics import record_cache
+
+DEFAULT_METADATA_CACHE = ".cache/metadata.sqlite3"
+KIND_DESCRIPTION = "description"
+KIND_PAGEIMAGE = "pageimage"
+KIND_LICENSE = "license"
+DEFAULT_TTL_HOURS = {
+    KIND_DESCRIPTION: 168.0,
+    KIND_PAGEIMAGE: 168.0,
+    KIND_LICENSE: 720.0,
+}
+SQLITE_MAX_PARAMS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    kind TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, scope, key)
+)
+"""
+
+
+class MetadataStore:
+    def __init__(
+        self,
+        path: str = DEFAULT_METADATA_CACHE,
+        ttl_hours: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_hours = dict(DEFAULT_TTL_HOURS)
+        if ttl_hours:
+            self.ttl_hours.update(ttl_hours)
+        self.hits: Dict[str, int] = {kind: 0 for kind in DEFAULT_TTL_HOURS}
+        self.misses: Dict[str, int] = {kind: 0 for kind in DEFAULT_TTL_HOURS}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def lookup(
+        self, kind: str, scope: str, keys: Iterable[str]
+    ) -> Tuple[Dict[str, object], List[str]]:
+        unique_keys = list(dict.fromkeys(key for key in keys if key))
+        oldest = time.time() - self.ttl_hours[kind] * 3600
+        found: Dict[str, object] = {}
+        with self._lock:
+            for offset in range(0, len(unique_keys), SQLITE_MAX_PARAMS):
+                batch = unique_keys[offset : offset + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._connection.execute(
+                    "SELECT key, value FROM metadata "
+                    f"WHERE kind = ? AND scope = ? AND fetched_at >= ? AND key IN ({placeholders})",
+                    [kind, scope, oldest, *batch],
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+            misses = [key for key in unique_keys if key not in found]
+            self.hits[kind] += len(found)
+            self.misses[kind] += len(misses)
+        record_cache(len(found), len(misses))
+        return found, misses
+
+    def store(self, kind: str, scope: str, values: Dict[str, object]) -> None:
+        if not values:
+            return
+        now = time.time()
+        rows = [
+            (kind, scope, key, json.dumps(value, ensure_ascii=False), now)
+            for key, value in values.items()
+            if key
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO metadata (kind, scope, key, value, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def summary(self) -> str:
+        parts = [
+            f"{kind} {self.hits[kind]} hit(s)/{self.misses[kind]} miss(es)"
+            for kind in DEFAULT_TTL_HOURS
+        ]
+        return "Metadata cache: " + ", ".join(parts) + "."
+
+
+def add_metadata_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--metadata-cache",
+        type=str,
+        default=DEFAULT_METADATA_CACHE,
+        help=(
+            "SQLite file caching descriptions, page images and image licenses "
+            f"(default: {DEFAULT_METADATA_CACHE})"
+        ),
+    )
+    parser.add_argument(
+        "--no-metadata-cache",
+        action="store_true",
+        help="Always query MediaWiki and Commons for enrichment metadata",
+    )
+    parser.add_argument(
+        "--description-ttl",
+        type=float,
+        default=DEFAULT_TTL_HOURS[KIND_DESCRIPTION],
+        help=(
+            "Hours a cached description stays valid "
+            f"(default: {DEFAULT_TTL_HOURS[KIND_DESCRIPTION]:g})"
+        ),
+    )
+    parser.add_argument(
+        "--pageimage-ttl",
+        type=float,
+        default=DEFAULT_TTL_HOURS[KIND_PAGEIMAGE],
+        help=(
+            "Hours a cached page image stays valid "
+            f"(default: {DEFAULT_TTL_HOURS[KIND_PAGEIMAGE]:g})"
+        ),
+    )
+    parser.add_argument(
+        "--license-ttl",
+        type=float,
+        default=DEFAULT_TTL_HOURS[KIND_LICENSE],
+        help=(
+            "Hours a cached Commons license stays valid "
+            f"(default: {DEFAULT_TTL_HOURS[KIND_LICENSE]:g})"
+        ),
+    )
+
+
+def metadata_store_from_args(args: argparse.Namespace) -> Optional[MetadataStore]:
+    if args.no_metadata_cache:
+        return None
+    return MetadataStore(
+        args.metadata_cache,
+        ttl_hours={
+            KIND_DESCRIPTION: args.description_ttl,
+            KIND_PAGEIMAGE: args.pageimage_ttl,
+            KIND_LICENSE: args.license_ttl,
+        },
+    )
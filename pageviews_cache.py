@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Local on-disk cache for daily pageviews/top responses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = ".cache/pageviews-top"
+DEFAULT_CACHE_MAX_MB = 512
+DEFAULT_NEGATIVE_TTL_HOURS = 168.0
+CACHE_FORMAT_VERSION = 1
+RECENT_DAYS_NOT_NEGATIVE_CACHED = 3
+
+
+@dataclass(frozen=True)
+class CachedDay:
+    status: int
+    articles: List[Dict[str, object]] = field(default_factory=list)
+    detail: str = ""
+    error: str = ""
+
+    @property
+    def missing(self) -> bool:
+        return self.status == 404
+
+
+def cache_key(project: str, access: str, day: date) -> str:
+    source = f"{project}/{access}/{day:%Y/%m/%d}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class DailyTopCache:
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_HOURS * 3600,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, project: str, access: str, day: date) -> Optional[CachedDay]:
+        path = self.path_for(cache_key(project, access, day))
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        status = payload.get("status")
+        if payload.get("version") != CACHE_FORMAT_VERSION or status not in (200, 404):
+            with self._lock:
+                self.misses += 1
+            return None
+        if status == 404:
+            cached_at = float(payload.get("cached_at", 0))
+            if time.time() - cached_at > self.negative_ttl:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return CachedDay(
+            status=int(status),
+            articles=list(payload.get("articles", [])),
+            detail=str(payload.get("detail", "")),
+            error=str(payload.get("error", "")),
+        )
+
+    def put_articles(
+        self, project: str, access: str, day: date, articles: List[Dict[str, object]]
+    ) -> None:
+        self._write(project, access, day, {"status": 200, "articles": articles})
+
+    def put_missing(
+        self, project: str, access: str, day: date, detail: str = "", error: str = ""
+    ) -> None:
+        today = datetime.now(timezone.utc).date()
+        if day >= today - timedelta(days=RECENT_DAYS_NOT_NEGATIVE_CACHED):
+            return
+        self._write(project, access, day, {"status": 404, "detail": detail, "error": error})
+
+    def discard_missing(self, project: str, access: str, day: date) -> None:
+        # Drops a cached 404 so the next lookup of this day asks the API again.
+        path = self.path_for(cache_key(project, access, day))
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if payload.get("status") != 404:
+            return
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _write(
+        self, project: str, access: str, day: date, payload: Dict[str, object]
+    ) -> None:
+        record = {
+            "version": CACHE_FORMAT_VERSION,
+            "project": project,
+            "access": access,
+            "date": day.isoformat(),
+            "cached_at": time.time(),
+            **payload,
+        }
+        data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        path = self.path_for(cache_key(project, access, day))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached daily top responses (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=(
+            "Size limit of the daily top cache in MB; least recently used "
+            f"entries are evicted first (default: {DEFAULT_CACHE_MAX_MB})"
+        ),
+    )
+    parser.add_argument(
+        "--negative-cache-ttl",
+        type=float,
+        default=DEFAULT_NEGATIVE_TTL_HOURS,
+        help=(
+            "Hours a cached 404 daily response is trusted before asking the API "
+            f"again (default: {DEFAULT_NEGATIVE_TTL_HOURS:g})"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the local daily top cache",
+    )
+
+
+def cache_from_args(args: argparse.Namespace) -> Optional[DailyTopCache]:
+    if args.no_cache:
+        return None
+    return DailyTopCache(
+        args.cache_dir,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        negative_ttl=args.negative_cache_ttl * 3600,
+    )
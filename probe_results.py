@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Persistent results of daily pageviews/top availability probes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from pageviews_cache import DEFAULT_NEGATIVE_TTL_HOURS, RECENT_DAYS_NOT_NEGATIVE_CACHED
+
+DEFAULT_PROBE_CACHE = ".cache/probe-results.json"
+PROBE_CACHE_VERSION = 1
+
+
+def probe_key(project: str, access: str, day: date) -> str:
+    return f"{project}/{access}/{day.isoformat()}"
+
+
+class ProbeResultCache:
+    def __init__(
+        self,
+        path: str = DEFAULT_PROBE_CACHE,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_HOURS * 3600,
+    ) -> None:
+        self.path = Path(path)
+        self.negative_ttl = negative_ttl
+        self.results: Dict[str, Dict[str, object]] = {}
+        self.hits = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != PROBE_CACHE_VERSION:
+            return
+        results = data.get("results")
+        if isinstance(results, dict):
+            self.results = {
+                str(key): value for key, value in results.items() if isinstance(value, dict)
+            }
+
+    def get(self, project: str, access: str, day: date) -> Optional[Tuple[int, str]]:
+        # Days that answered 2xx stay available; a 404 is asked again after the TTL.
+        with self._lock:
+            result = self.results.get(probe_key(project, access, day))
+            if result is None:
+                return None
+            status = int(result.get("status", 0))
+            if status == 404:
+                checked_at = float(result.get("checked_at", 0))
+                if time.time() - checked_at > self.negative_ttl:
+                    return None
+            elif not 200 <= status < 300:
+                return None
+            self.hits += 1
+            return status, str(result.get("detail", ""))
+
+    def put(self, project: str, access: str, day: date, status: int, detail: str = "") -> None:
+        if status != 404 and not 200 <= status < 300:
+            return
+        today = datetime.now(timezone.utc).date()
+        if status == 404 and day >= today - timedelta(days=RECENT_DAYS_NOT_NEGATIVE_CACHED):
+            return
+        with self._lock:
+            self.results[probe_key(project, access, day)] = {
+                "status": status,
+                "detail": detail,
+                "checked_at": time.time(),
+            }
+            self.dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.dirty:
+                return
+            data = {"version": PROBE_CACHE_VERSION, "results": dict(sorted(self.results.items()))}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(
+                f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            tmp_path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+def add_probe_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--probe-cache",
+        type=str,
+        default=DEFAULT_PROBE_CACHE,
+        help=(
+            "JSON file remembering which days answered 2xx or 404 when probed "
+            f"(default: {DEFAULT_PROBE_CACHE})"
+        ),
+    )
+    parser.add_argument(
+        "--no-probe-cache",
+        action="store_true",
+        help="Do not read or write the probe result cache",
+    )
+
+
+def probe_cache_from_args(args: argparse.Namespace) -> Optional[ProbeResultCache]:
+    if args.no_probe_cache:
+        return None
+    return ProbeResultCache(args.probe_cache, negative_ttl=args.negative_cache_ttl * 3600)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import render_markdown
+import render_wikicode
+from build_manifest import (
+    BuildManifest,
+    add_build_manifest_arguments,
+    build_manifest_from_args,
+    file_hash,
+)
+from render_utils import load_json
+
+WEEK_FILE_PATTERN = re.compile(r"^(\d{4})-(\d{2})\.json$")
+RENDERERS: Dict[str, Tuple[Callable[[Dict[str, object]], str], str]] = {
+    "markdown": (render_markdown.render_markdown, ".md"),
+    "wikicode": (render_wikicode.render_wikicode, ".wiki"),
+}
+RENDERER_IDS: Dict[str, Callable[[], str]] = {
+    "markdown": render_markdown.renderer_id,
+    "wikicode": render_wikicode.renderer_id,
+}
+DEFAULT_OUTPUT_DIRS = {"markdown": "markdown", "wikicode": "wikicode"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Render Markdown and/or wikicode for many weekly JSON exports at once, "
+            "parsing each JSON file once and spreading weeks over a process pool."
+        )
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Weekly JSON files, directories or glob patterns (quoted)",
+    )
+    parser.add_argument(
+        "--weeks",
+        action="append",
+        default=[],
+        metavar="YYYY-WW[:YYYY-WW]",
+        help="Week or inclusive week range read from --json-dir; repeatable",
+    )
+    parser.add_argument(
+        "--json-dir",
+        type=str,
+        default="docs/json",
+        help="Directory used for --weeks and when no input is given (default: docs/json)",
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        nargs="+",
+        choices=sorted(RENDERERS),
+        default=sorted(RENDERERS),
+        help="Formats to render (default: markdown wikicode)",
+    )
+    parser.add_argument(
+        "--markdown-dir",
+        type=str,
+        default=DEFAULT_OUTPUT_DIRS["markdown"],
+        help="Output directory for Markdown files (default: markdown)",
+    )
+    parser.add_argument(
+        "--wikicode-dir",
+        type=str,
+        default=DEFAULT_OUTPUT_DIRS["wikicode"],
+        help="Output directory for wikicode files (default: wikicode)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Rendering processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help=(
+            "Delete outputs recorded in the build manifest whose input JSON "
+            "no longer exists"
+        ),
+    )
+    add_build_manifest_arguments(parser)
+    args = parser.parse_args()
+    try:
+        args.week_ranges = [parse_week_range(value) for value in args.weeks]
+    except ValueError as exc:
+        parser.error(str(exc))
+    return args
+
+
+def parse_week(value: str) -> date:
+    match = re.fullmatch(r"(\d{4})-(\d{2})", value)
+    if not match:
+        raise ValueError(f"Invalid week '{value}'; expected YYYY-WW")
+    return date.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+
+
+def parse_week_range(value: str) -> Tuple[date, date]:
+    start, _, end = value.partition(":")
+    first = parse_week(start)
+    last = parse_week(end) if end else first
+    if last < first:
+        raise ValueError(f"Invalid week range '{value}': end before start")
+    return first, last
+
+
+def week_range_paths(json_dir: Path, first: date, last: date) -> List[Path]:
+    paths = []
+    current = first
+    while current <= last:
+        year, week, _ = current.isocalendar()
+        paths.append(json_dir / f"{year}-{week:02d}.json")
+        current += timedelta(days=7)
+    return paths
+
+
+def resolve_inputs(
+    inputs: Sequence[str], week_ranges: Sequence[Tuple[date, date]], json_dir: str
+) -> List[Path]:
+    paths: List[Path] = []
+    for value in inputs:
+        path = Path(value)
+        if path.is_dir():
+            paths.extend(
+                item
+                for item in sorted(path.glob("*.json"))
+                if WEEK_FILE_PATTERN.match(item.name)
+            )
+        elif glob.has_magic(value):
+            paths.extend(Path(item) for item in sorted(glob.glob(value)))
+        else:
+            paths.append(path)
+    for first, last in week_ranges:
+        paths.extend(week_range_paths(Path(json_dir), first, last))
+    if not inputs and not week_ranges:
+        paths.extend(
+            item
+            for item in sorted(Path(json_dir).glob("*.json"))
+            if WEEK_FILE_PATTERN.match(item.name)
+        )
+    return list(dict.fromkeys(Path(path) for path in paths))
+
+
+@dataclass
+class RenderResult:
+    input_path: str
+    status: str
+    outputs: Dict[str, str] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    error: str = ""
+
+
+def render_week(
+    input_path: str, formats: Sequence[str], output_dirs: Dict[str, str]
+) -> RenderResult:
+    started = time.perf_counter()
+    try:
+        data = load_json(Path(input_path))
+    except (OSError, ValueError) as exc:
+        return RenderResult(input_path, "failed", error=str(exc))
+    seconds = {"parse": time.perf_counter() - started}
+    try:
+        year = int(data.get("year", 0))
+        week = int(data.get("week", 0))
+    except (AttributeError, TypeError, ValueError):
+        year = week = 0
+    if not year or not week:
+        return RenderResult(input_path, "skipped", error="not a weekly export (no year/week)")
+
+    result = RenderResult(input_path, "rendered", seconds=seconds)
+    for fmt in formats:
+        render, suffix = RENDERERS[fmt]
+        started = time.perf_counter()
+        try:
+            content = render(data)
+            output_dir = Path(output_dirs[fmt])
+            output_dir.mkdir(parents=True, exist_ok=True)
+            output_path = output_dir / f"{year}-{week:02d}{suffix}"
+            output_path.write_text(content, encoding="utf-8")
+        except (OSError, ValueError, TypeError, KeyError) as exc:
+            result.status = "failed"
+            result.error = f"{fmt}: {exc}"
+            return result
+        result.outputs[fmt] = str(output_path)
+        seconds[fmt] = time.perf_counter() - started
+    return result
+
+
+def _render_task(task: Tuple[str, Sequence[str], Dict[str, str]]) -> RenderResult:
+    return render_week(*task)
+
+
+def is_current_in(
+    manifest: BuildManifest, inputs: Dict[str, str], renderer: str, output_dir: str
+) -> bool:
+    output = manifest.current_output(inputs, renderer)
+    return output is not None and Path(output).parent == Path(output_dir)
+
+
+def render_all(
+    paths: Sequence[Path],
+    formats: Sequence[str],
+    output_dirs: Dict[str, str],
+    workers: Optional[int] = None,
+    manifest: Optional[BuildManifest] = None,
+    incremental: bool = False,
+) -> List[RenderResult]:
+    renderers = {fmt: RENDERER_IDS[fmt]() for fmt in formats}
+    input_hashes = {str(path): file_hash(path) or "" for path in paths}
+    results: List[RenderResult] = []
+    tasks = []
+    for path in paths:
+        stale = list(formats)
+        if incremental and manifest is not None:
+            inputs = {str(path): input_hashes[str(path)]}
+            stale = [
+                fmt
+                for fmt in formats
+                if not is_current_in(manifest, inputs, renderers[fmt], output_dirs[fmt])
+            ]
+        if stale:
+            tasks.append((str(path), stale, output_dirs))
+        else:
+            results.append(RenderResult(str(path), "unchanged"))
+    if not tasks:
+        return results
+
+    if workers == 1:
+        rendered = [_render_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            rendered = list(executor.map(_render_task, tasks, chunksize=chunksize))
+    if manifest is not None:
+        for result in rendered:
+            inputs = {result.input_path: input_hashes[result.input_path]}
+            for fmt, output in result.outputs.items():
+                manifest.record(output, inputs, renderers[fmt])
+    return results + rendered
+
+
+def print_summary(results: Sequence[RenderResult], elapsed: float) -> None:
+    counts = {"rendered": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    stage_seconds: Dict[str, float] = {}
+    outputs = 0
+    for result in results:
+        counts[result.status] += 1
+        outputs += len(result.outputs)
+        for name, seconds in result.seconds.items():
+            stage_seconds[name] = stage_seconds.get(name, 0.0) + seconds
+    for result in results:
+        if result.status in ("skipped", "failed"):
+            print(f"[{result.status}] {result.input_path}: {result.error}", file=sys.stderr)
+    print(
+        f"Rendered {counts['rendered']} week(s) into {outputs} file(s), "
+        f"unchanged {counts['unchanged']}, skipped {counts['skipped']}, failed {counts['failed']} in {elapsed:.2f}s."
+    )
+    if stage_seconds:
+        print(
+            "CPU time: "
+            + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in stage_seconds.items())
+        )
+
+
+def main() -> int:
+    args = parse_args()
+    paths = resolve_inputs(args.inputs, args.week_ranges, args.json_dir)
+    if not paths:
+        print("No weekly JSON files to render.", file=sys.stderr)
+        return 2
+    output_dirs = {"markdown": args.markdown_dir, "wikicode": args.wikicode_dir}
+
+    manifest = build_manifest_from_args(args)
+    started = time.perf_counter()
+    results = render_all(
+        paths, args.formats, output_dirs, args.workers, manifest, args.incremental
+    )
+    print_summary(results, time.perf_counter() - started)
+    if args.prune:
+        removed = manifest.prune(output_dirs[fmt] for fmt in args.formats)
+        for output in removed:
+            print(f"[pruned] {output}")
+        print(f"Pruned {len(removed)} orphaned output(s).")
+    manifest.save()
+    return 1 if any(result.status == "failed" for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
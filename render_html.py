@@ -4,8 +4,16 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Tuple
+
+from build_manifest import (
+    add_build_manifest_arguments,
+    build_manifest_from_args,
+    content_hash,
+    renderer_version,
+)
 
 WEEK_FILE_PATTERN = re.compile(r"^(\d{4})-(\d{2})\.json$")
 THUMB_SIZE_PX = 80
@@ -33,9 +41,14 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="How many previous-year links to show in header navigation",
     )
+    add_build_manifest_arguments(parser)
     return parser.parse_args()
 
 
+def renderer_id() -> str:
+    return "html:" + renderer_version(__file__)
+
+
 def discover_week_files(json_dir: Path) -> List[Path]:
     files: List[Path] = []
     for path in sorted(json_dir.glob("*.json")):
@@ -448,14 +461,35 @@ def main() -> int:
 
     week_files = discover_week_files(json_dir)
     week_ids = [path.stem for path in week_files]
-    write_weeks_file(week_ids, docs_dir)
-    write_index_html(docs_dir)
-    write_week_html(
-        docs_dir,
-        args.previous_years,
-        args.json_url_base,
-        THUMB_SIZE_PX,
-    )
+    # weeks.json depends on the list of weeks, week.html on its options.
+    week_options = [args.previous_years, args.json_url_base, THUMB_SIZE_PX]
+    outputs: List[Tuple[Path, Dict[str, str], Callable[[], None]]] = [
+        (
+            docs_dir / "weeks.json",
+            {str(json_dir): content_hash(json.dumps(week_ids).encode("utf-8"))},
+            lambda: write_weeks_file(week_ids, docs_dir),
+        ),
+        (docs_dir / "index.html", {}, lambda: write_index_html(docs_dir)),
+        (
+            docs_dir / "week.html",
+            {"options": content_hash(json.dumps(week_options).encode("utf-8"))},
+            lambda: write_week_html(
+                docs_dir,
+                args.previous_years,
+                args.json_url_base,
+                THUMB_SIZE_PX,
+            ),
+        ),
+    ]
+    manifest = build_manifest_from_args(args)
+    renderer = renderer_id()
+    for path, inputs, write in outputs:
+        if args.incremental and manifest.is_current(str(path), inputs, renderer):
+            print(f"{path} is up to date.", file=sys.stderr)
+            continue
+        write()
+        manifest.record(str(path), inputs, renderer)
+    manifest.save()
     return 0
 
 
@@ -7,6 +7,13 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from urllib.parse import quote
 
+import render_utils
+from build_manifest import (
+    add_build_manifest_arguments,
+    build_manifest_from_args,
+    file_hash,
+    renderer_version,
+)
 from render_utils import (
     bar_chart_svg,
     escape_html_attr,
@@ -27,9 +34,14 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Output file path, use '-' for stdout",
     )
+    add_build_manifest_arguments(parser)
     return parser.parse_args()
 
 
+def renderer_id() -> str:
+    return "markdown:" + renderer_version(__file__, render_utils.__file__)
+
+
 def build_rows(articles: List[Dict[str, object]]) -> List[str]:
     rows = []
     for item in articles:
@@ -95,6 +107,19 @@ def resolve_output_path(output: Optional[str], year: int, week: int) -> Optional
 
 def main() -> int:
     args = parse_args()
+    manifest = build_manifest_from_args(args)
+    inputs = {str(Path(args.input)): file_hash(Path(args.input)) or ""}
+    renderer = renderer_id()
+    if args.incremental and args.output != "-":
+        current = (
+            manifest.current_output(inputs, renderer)
+            if args.output is None
+            else str(Path(args.output))
+        )
+        if current is not None and manifest.is_current(current, inputs, renderer):
+            print(f"{current} is up to date.", file=sys.stderr)
+            return 0
+
     data = load_json(Path(args.input))
     year = int(data.get("year", 0))
     week = int(data.get("week", 0))
@@ -106,6 +131,8 @@ def main() -> int:
         return 0
 
     output_path.write_text(content, encoding="utf-8")
+    manifest.record(str(output_path), inputs, renderer)
+    manifest.save()
     return 0
 
 
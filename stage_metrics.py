@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing, request and cache metrics for collector runs.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+_metrics: contextvars.ContextVar[Optional["RunMetrics"]] = contextvars.ContextVar(
+    "stage_metrics", default=None
+)
+_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "stage_name", default=None
+)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 0.50), 4),
+        "p90": round(percentile(values, 0.90), 4),
+        "p99": round(percentile(values, 0.99), 4),
+        "max": round(max(values), 4) if values else 0.0,
+    }
+
+
+class EventLog:
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._handle: TextIO = open(path, "a", encoding="utf-8")
+
+    def emit(self, event: str, **fields: Any) -> None:
+        record = {"ts": datetime.now(timezone.utc).isoformat(), "event": event, **fields}
+        line = json.dumps(record, ensure_ascii=False, sort_keys=False)
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+class StageStats:
+    def __init__(self) -> None:
+        self.durations: List[float] = []
+        self.request_latencies: List[float] = []
+        self.bytes = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def merge(self, other: "StageStats") -> None:
+        self.durations.extend(other.durations)
+        self.request_latencies.extend(other.request_latencies)
+        self.bytes += other.bytes
+        self.retries += other.retries
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+    def as_dict(self, percentiles: bool = True) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "calls": len(self.durations),
+            "seconds": round(sum(self.durations), 4),
+            "requests": len(self.request_latencies),
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+        if percentiles:
+            data["duration"] = latency_summary(self.durations)
+            data["request_latency"] = latency_summary(self.request_latencies)
+        return data
+
+
+class RunMetrics:
+    def __init__(self, label: str = "", events: Optional[EventLog] = None) -> None:
+        self.label = label
+        self.events = events
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def add_duration(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._stats(name).durations.append(seconds)
+        if self.events is not None:
+            self.events.emit("stage", week=self.label, stage=name, seconds=round(seconds, 4))
+
+    def add_request(self, name: str, seconds: float, size: int, retries: int) -> None:
+        with self._lock:
+            stats = self._stats(name)
+            stats.request_latencies.append(seconds)
+            stats.bytes += size
+            stats.retries += retries
+
+    def add_cache(self, name: str, hits: int, misses: int) -> None:
+        with self._lock:
+            stats = self._stats(name)
+            stats.cache_hits += hits
+            stats.cache_misses += misses
+
+    def merge(self, other: "RunMetrics") -> None:
+        with self._lock:
+            for name, stats in other.stages.items():
+                self._stats(name).merge(stats)
+
+    def as_dict(self, percentiles: bool = True) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: stats.as_dict(percentiles) for name, stats in self.stages.items()
+            }
+
+
+@contextmanager
+def collecting(metrics: Optional[RunMetrics]) -> Iterator[None]:
+    token = _metrics.set(metrics)
+    try:
+        yield
+    finally:
+        _metrics.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    metrics = _metrics.get()
+    token = _stage.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+        if metrics is not None:
+            metrics.add_duration(name, time.perf_counter() - started)
+
+
+def record_request(seconds: float, size: int, retries: int) -> None:
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.add_request(_stage.get() or "other", seconds, size, retries)
+
+
+def record_cache(hits: int = 0, misses: int = 0) -> None:
+    metrics = _metrics.get()
+    if metrics is not None and (hits or misses):
+        metrics.add_cache(_stage.get() or "other", hits, misses)
+
+
+def submit(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    # Worker threads do not inherit context variables; run the task in a copy
+    # of the submitting thread's context so its requests keep their stage.
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+def run_in_stage(name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    with stage(name):
+        return fn(*args, **kwargs)
+
+
+def submit_stage(
+    executor: Executor, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Future:
+    return submit(executor, run_in_stage, name, fn, *args, **kwargs)
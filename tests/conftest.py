@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def collector():
+    # The collector's file name is not a valid module name; load it by path.
+    import backfill_weeks
+
+    return backfill_weeks.load_collector()
@@ -0,0 +1,120 @@
+from datetime import date
+
+from day_coverage import (
+    STATUS_NO_WEEK,
+    STATUS_NOT_FOUND,
+    STATUS_PENDING,
+    STATUS_PRESENT,
+    STATUS_REQUEST_ERROR,
+    DayCoverage,
+    day_status,
+    format_day_range,
+)
+
+
+def coverage_for_march_2024():
+    # Weeks 10-12 of 2024 run from 4 to 24 March.
+    coverage = DayCoverage(date(2024, 3, 1), date(2024, 3, 31))
+    coverage.add_week(2024, 10, {})
+    coverage.add_week(
+        2024,
+        11,
+        {"2024-03-12": 404, "2024-03-13": "404", "2024-03-14": 503, "2024-03-15": "pending"},
+    )
+    coverage.add_week(2024, 12, {"2024-03-24": "Connection refused"})
+    return coverage
+
+
+def test_day_status():
+    assert day_status(404) == STATUS_NOT_FOUND
+    assert day_status("pending") == STATUS_PENDING
+    assert day_status(500) == STATUS_REQUEST_ERROR
+    assert day_status("Read timed out") == STATUS_REQUEST_ERROR
+
+
+def test_status_of_days():
+    coverage = coverage_for_march_2024()
+    assert coverage.status(date(2024, 3, 3)) == STATUS_NO_WEEK
+    assert coverage.status(date(2024, 3, 11)) == STATUS_PRESENT
+    assert coverage.status(date(2024, 3, 12)) == STATUS_NOT_FOUND
+    assert coverage.status(date(2024, 3, 14)) == STATUS_REQUEST_ERROR
+
+
+def test_ranges_merge_consecutive_days_with_the_same_status():
+    assert coverage_for_march_2024().ranges() == [
+        (date(2024, 3, 1), date(2024, 3, 3), STATUS_NO_WEEK),
+        (date(2024, 3, 12), date(2024, 3, 13), STATUS_NOT_FOUND),
+        (date(2024, 3, 14), date(2024, 3, 14), STATUS_REQUEST_ERROR),
+        (date(2024, 3, 15), date(2024, 3, 15), STATUS_PENDING),
+        (date(2024, 3, 24), date(2024, 3, 24), STATUS_REQUEST_ERROR),
+        (date(2024, 3, 25), date(2024, 3, 31), STATUS_NO_WEEK),
+    ]
+
+
+def test_ranges_split_on_present_days():
+    coverage = DayCoverage(date(2024, 3, 11), date(2024, 3, 17))
+    coverage.add_week(2024, 11, {"2024-03-11": 404, "2024-03-13": 404})
+    assert [item[:2] for item in coverage.ranges()] == [
+        (date(2024, 3, 11), date(2024, 3, 11)),
+        (date(2024, 3, 13), date(2024, 3, 13)),
+    ]
+
+
+def test_complete_coverage_has_no_ranges():
+    coverage = DayCoverage(date(2024, 3, 11), date(2024, 3, 17))
+    coverage.add_week(2024, 11, {})
+    assert coverage.ranges() == []
+
+
+def test_counts_cover_every_day_in_range():
+    counts = coverage_for_march_2024().counts()
+    assert counts == {
+        STATUS_PRESENT: 16,
+        STATUS_NOT_FOUND: 2,
+        STATUS_REQUEST_ERROR: 2,
+        STATUS_PENDING: 1,
+        STATUS_NO_WEEK: 10,
+    }
+    assert sum(counts.values()) == 31
+
+
+def test_format_day_range():
+    assert format_day_range((date(2024, 3, 14), date(2024, 3, 14), "404")) == "2024-03-14: 404"
+    assert (
+        format_day_range((date(2024, 3, 12), date(2024, 3, 13), "404"))
+        == "2024-03-12 -> 2024-03-13: 404 (2 days)"
+    )
+
+
+def test_calendar_rows_are_clipped_to_the_range():
+    coverage = DayCoverage(date(2024, 2, 27), date(2024, 3, 12))
+    coverage.add_week(2024, 10, {"2024-03-05": 404})
+    coverage.add_week(2024, 11, {})
+    lines = coverage.calendar()
+    assert lines[1] == "2024-02 " + " " * 26 + "..."
+    assert lines[2] == "2024-03 " + "..." + "#x#####" + "##" + " " * 19
+
+
+class StubManifest:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def entry(self, week_key):
+        return self.entries.get(week_key)
+
+
+def test_from_manifest_skips_unreadable_and_unknown_weeks():
+    manifest = StubManifest(
+        {
+            "2024-10": {"readable": True, "missing_status": {"2024-03-06": 404}},
+            "2024-11": {"readable": False, "missing_status": {}},
+        }
+    )
+    coverage = DayCoverage.from_manifest(
+        manifest, ["2024-10", "2024-11", "2024-12"], date(2024, 3, 4), date(2024, 3, 24)
+    )
+    assert coverage.counts()[STATUS_PRESENT] == 6
+    assert coverage.ranges() == [
+        (date(2024, 3, 6), date(2024, 3, 6), STATUS_NOT_FOUND),
+        (date(2024, 3, 11), date(2024, 3, 24), STATUS_NO_WEEK),
+    ]
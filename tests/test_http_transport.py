@@ -0,0 +1,59 @@
+import threading
+import time
+
+from http_transport import TokenBucket, TransportStats
+
+
+def test_burst_is_served_without_waiting():
+    bucket = TokenBucket(5.0)
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+
+
+def test_empty_bucket_waits_for_the_next_token():
+    bucket = TokenBucket(20.0, burst=1.0)
+    assert bucket.acquire() == 0.0
+    started = time.monotonic()
+    waited = bucket.acquire()
+    assert time.monotonic() - started >= 0.04
+    assert 0.04 <= waited <= 0.2
+
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(0.0)
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
+    bucket.slow_down()
+    bucket.recover()
+    assert bucket.rate == 0.0
+
+
+def test_slow_down_halves_to_the_floor_and_recover_returns_to_target():
+    bucket = TokenBucket(8.0)
+    bucket.slow_down()
+    assert bucket.rate == 4.0
+    for _ in range(10):
+        bucket.slow_down()
+    assert bucket.rate == bucket.min_rate == 0.5
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == bucket.target_rate == 8.0
+
+
+def test_concurrent_waits_are_counted_once():
+    bucket = TokenBucket(20.0, burst=1.0)
+    bucket.acquire()
+    stats = TransportStats()
+
+    def worker():
+        stats.add(throttled_seconds=bucket.acquire())
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    # Four tokens at 20/s take about 0.2s; summing every thread's wait
+    # would report roughly twice that.
+    assert 0.15 <= stats.throttled_seconds <= elapsed + 0.01
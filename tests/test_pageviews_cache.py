@@ -0,0 +1,121 @@
+import json
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from pageviews_cache import (
+    RECENT_DAYS_NOT_NEGATIVE_CACHED,
+    DailyTopCache,
+    cache_key,
+)
+
+PROJECT = "it.wikipedia"
+ACCESS = "all-access"
+OLD_DAY = date(2024, 3, 31)
+ARTICLES = [{"article": "Roma", "views": 100, "rank": 1}]
+
+
+def entry_path(cache, day):
+    return cache.path_for(cache_key(PROJECT, ACCESS, day))
+
+
+def test_articles_round_trip(tmp_path):
+    cache = DailyTopCache(str(tmp_path))
+    assert cache.get(PROJECT, ACCESS, OLD_DAY) is None
+    cache.put_articles(PROJECT, ACCESS, OLD_DAY, ARTICLES)
+
+    cached = cache.get(PROJECT, ACCESS, OLD_DAY)
+    assert cached.status == 200
+    assert cached.articles == ARTICLES
+    assert not cached.missing
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_keys_separate_project_access_and_day(tmp_path):
+    cache = DailyTopCache(str(tmp_path))
+    cache.put_articles(PROJECT, ACCESS, OLD_DAY, ARTICLES)
+    assert cache.get("en.wikipedia", ACCESS, OLD_DAY) is None
+    assert cache.get(PROJECT, "mobile-web", OLD_DAY) is None
+    assert cache.get(PROJECT, ACCESS, OLD_DAY + timedelta(days=1)) is None
+
+
+def test_missing_day_is_cached_until_the_negative_ttl(tmp_path):
+    cache = DailyTopCache(str(tmp_path), negative_ttl=3600)
+    cache.put_missing(PROJECT, ACCESS, OLD_DAY, "Not found", "Request failed: 404")
+
+    cached = cache.get(PROJECT, ACCESS, OLD_DAY)
+    assert cached.missing
+    assert cached.detail == "Not found"
+    assert cached.error == "Request failed: 404"
+
+    path = entry_path(cache, OLD_DAY)
+    record = json.loads(path.read_text(encoding="utf-8"))
+    record["cached_at"] = time.time() - 7200
+    path.write_text(json.dumps(record), encoding="utf-8")
+    assert cache.get(PROJECT, ACCESS, OLD_DAY) is None
+
+
+def test_recent_missing_days_are_not_cached(tmp_path):
+    cache = DailyTopCache(str(tmp_path))
+    today = datetime.now(timezone.utc).date()
+    recent = today - timedelta(days=RECENT_DAYS_NOT_NEGATIVE_CACHED - 1)
+    cache.put_missing(PROJECT, ACCESS, recent)
+    assert not entry_path(cache, recent).exists()
+
+
+def test_discard_missing_drops_only_404_entries(tmp_path):
+    cache = DailyTopCache(str(tmp_path))
+    other_day = OLD_DAY - timedelta(days=1)
+    cache.put_missing(PROJECT, ACCESS, OLD_DAY)
+    cache.put_articles(PROJECT, ACCESS, other_day, ARTICLES)
+
+    cache.discard_missing(PROJECT, ACCESS, OLD_DAY)
+    cache.discard_missing(PROJECT, ACCESS, other_day)
+    assert cache.get(PROJECT, ACCESS, OLD_DAY) is None
+    assert cache.get(PROJECT, ACCESS, other_day).articles == ARTICLES
+
+
+def test_unknown_format_version_is_a_miss(tmp_path):
+    cache = DailyTopCache(str(tmp_path))
+    cache.put_articles(PROJECT, ACCESS, OLD_DAY, ARTICLES)
+    path = entry_path(cache, OLD_DAY)
+    record = json.loads(path.read_text(encoding="utf-8"))
+    record["version"] = -1
+    path.write_text(json.dumps(record), encoding="utf-8")
+    assert cache.get(PROJECT, ACCESS, OLD_DAY) is None
+
+
+def test_eviction_removes_least_recently_used_entries(tmp_path):
+    days = [OLD_DAY + timedelta(days=offset) for offset in range(3)]
+    probe = DailyTopCache(str(tmp_path / "probe"))
+    probe.put_articles(PROJECT, ACCESS, days[0], ARTICLES)
+    size = entry_path(probe, days[0]).stat().st_size
+
+    cache = DailyTopCache(str(tmp_path / "cache"), max_bytes=int(size * 2.5))
+    now = time.time()
+    for offset, day in enumerate(days[:2]):
+        cache.put_articles(PROJECT, ACCESS, day, ARTICLES)
+        os.utime(entry_path(cache, day), (now - 100 + offset, now - 100 + offset))
+    cache.put_articles(PROJECT, ACCESS, days[2], ARTICLES)
+
+    assert not entry_path(cache, days[0]).exists()
+    assert entry_path(cache, days[1]).exists()
+    assert entry_path(cache, days[2]).exists()
+
+
+def test_reads_refresh_recency_before_eviction(tmp_path):
+    days = [OLD_DAY + timedelta(days=offset) for offset in range(3)]
+    probe = DailyTopCache(str(tmp_path / "probe"))
+    probe.put_articles(PROJECT, ACCESS, days[0], ARTICLES)
+    size = entry_path(probe, days[0]).stat().st_size
+
+    cache = DailyTopCache(str(tmp_path / "cache"), max_bytes=int(size * 2.5))
+    now = time.time()
+    for offset, day in enumerate(days[:2]):
+        cache.put_articles(PROJECT, ACCESS, day, ARTICLES)
+        os.utime(entry_path(cache, day), (now - 100 + offset, now - 100 + offset))
+    assert cache.get(PROJECT, ACCESS, days[0]) is not None
+    cache.put_articles(PROJECT, ACCESS, days[2], ARTICLES)
+
+    assert entry_path(cache, days[0]).exists()
+    assert not entry_path(cache, days[1]).exists()
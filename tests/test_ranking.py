@@ -0,0 +1,116 @@
+import pytest
+
+from aggregation import PythonAggregate, StreamingAggregate, aggregate_daily_lists, np
+
+DAYS = [
+    [
+        {"article": "Pagina_principale", "views": 900},
+        {"article": "Roma", "views": 50},
+        {"article": "Milano", "views": 30},
+        {"article": "Speciale:Ricerca", "views": 40},
+    ],
+    [
+        {"article": "Napoli", "views": 60},
+        {"article": "Roma", "views": 10},
+        {"article": "Torino", "views": 60},
+    ],
+    [
+        {"article": "Milano", "views": 30},
+        {"article": "Bari", "views": 60},
+        {"article": "Firenze", "views": "n/a"},
+        {"views": 5},
+    ],
+]
+
+needs_numpy = pytest.mark.skipif(np is None, reason="numpy is not installed")
+backends = ["python", pytest.param("numpy", marks=needs_numpy)]
+
+
+def ranked(collector, aggregate, limit, include_all=True):
+    return collector.rank_totals(
+        aggregate.totals(ordered=True),
+        limit,
+        exclude_stopwords=True,
+        include_all=include_all,
+        ordered=True,
+    )
+
+
+@pytest.mark.parametrize("backend", backends)
+def test_ties_keep_first_seen_order(collector, backend):
+    aggregate = aggregate_daily_lists(DAYS, backend)
+    ranked_all, top, kept = ranked(collector, aggregate, 3)
+    assert [(row["article"], row["views"]) for row in ranked_all] == [
+        ("Roma", 60),
+        ("Milano", 60),
+        ("Napoli", 60),
+        ("Torino", 60),
+        ("Bari", 60),
+    ]
+    assert [row["rank"] for row in top] == [1, 2, 3]
+    assert kept == 5
+
+
+@needs_numpy
+def test_backends_rank_identically(collector):
+    days = [
+        [{"article": f"T{(day * 7 + item) % 40}", "views": (item * 13) % 17}
+         for item in range(25)]
+        for day in range(7)
+    ]
+    python = ranked(collector, aggregate_daily_lists(days, "python"), 10)
+    numpy = ranked(collector, aggregate_daily_lists(days, "numpy"), 10)
+    assert python == numpy
+    for title in ("T0", "T13", "missing"):
+        assert (
+            aggregate_daily_lists(days, "python").daily_views(title)
+            == aggregate_daily_lists(days, "numpy").daily_views(title)
+        )
+
+
+@pytest.mark.parametrize("include_all", [True, False])
+def test_ordered_input_matches_sorting(collector, include_all):
+    aggregate = PythonAggregate(DAYS)
+    expected = collector.rank_totals(
+        aggregate.totals(), 2, exclude_stopwords=True, include_all=include_all
+    )
+    assert ranked(collector, aggregate, 2, include_all=include_all) == expected
+
+
+def test_top_only_ranking_drops_the_full_list(collector):
+    ranked_all, top, kept = collector.rank_totals(
+        {"A": 1, "B": 5, "Wikipedia:Bar": 9, "C": 3}, 2,
+        exclude_stopwords=True, include_all=False,
+    )
+    assert ranked_all == []
+    assert [(row["article"], row["rank"]) for row in top] == [("B", 1), ("C", 2)]
+    assert kept == 3
+
+
+def test_zero_limit_keeps_every_title(collector):
+    _, top, _ = collector.rank_totals({"A": 1, "B": 5}, 0, include_all=False)
+    assert [row["article"] for row in top] == ["B", "A"]
+
+
+def test_excluded_titles(collector):
+    assert collector.is_excluded_title("Pagina principale")
+    assert collector.is_excluded_title("File:Logo.png")
+    assert not collector.is_excluded_title("Filosofia")
+
+
+@pytest.mark.parametrize("keep_days", [True, False])
+def test_streaming_aggregate_matches_python(keep_days):
+    expected = PythonAggregate(DAYS)
+    aggregate = StreamingAggregate(len(DAYS), keep_days=keep_days)
+    for position, daily in enumerate(DAYS):
+        aggregate.add_day(position, daily)
+    assert aggregate.keeps_days is keep_days
+    assert aggregate.totals(ordered=True) == expected.totals(ordered=True)
+
+    aggregate.select(["Roma", "Milano", "missing"])
+    if not keep_days:
+        for position, daily in enumerate(DAYS):
+            aggregate.add_selected(position, daily)
+    for title in ("Roma", "Milano"):
+        assert aggregate.daily_views(title) == expected.daily_views(title)
+    assert aggregate.daily_views("Napoli") == [0, 0, 0]
@@ -0,0 +1,131 @@
+import json
+import re
+
+import pytest
+import requests
+
+YEAR, WEEK = 2024, 13
+MISSING_DAY = "2024-03-27"
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload) if payload is not None else "Not found"
+        self.content = self.text.encode()
+        self.headers = {}
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("no JSON body")
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+
+class FakeSession:
+    """Answers the pageviews and MediaWiki APIs with deterministic data."""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.calls = []
+        self.headers = {}
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append(url)
+        match = re.search(r"/top/[^/]+/[^/]+/(\d{4})/(\d{2})/(\d{2})$", url)
+        if match:
+            day = "-".join(match.groups())
+            if day in self.missing:
+                return FakeResponse(404)
+            offset = int(match.group(3))
+            articles = [
+                {"article": f"A_{rank}", "views": 100 * rank + offset, "rank": rank}
+                for rank in range(1, 30)
+            ]
+            articles.append({"article": f"Only_{day}", "views": 5000, "rank": 30})
+            return FakeResponse(200, {"items": [{"articles": articles}]})
+        titles = (params or {}).get("titles", "").split("|")
+        pages = [
+            {"title": title.replace("_", " "), "pageid": index}
+            for index, title in enumerate(titles)
+        ]
+        if (params or {}).get("formatversion") == "2":
+            return FakeResponse(200, {"query": {"pages": pages}})
+        return FakeResponse(
+            200, {"query": {"pages": {str(page["pageid"]): page for page in pages}}}
+        )
+
+
+def week_args(collector, tmp_path, *extra):
+    return collector.parse_args(
+        [
+            "--year", str(YEAR),
+            "--week", str(WEEK),
+            "--limit", "10",
+            "--json-dir", str(tmp_path / "json"),
+            "--raw-json-dir", str(tmp_path / "rawjson"),
+            "--no-cache",
+            "--no-daily-archive",
+            "--no-metadata-cache",
+            "--allow-missing-days",
+            *extra,
+        ]
+    )
+
+
+def collect(collector, args, session):
+    enriched, raw, status = collector.collect_week(args, session)
+    assert status.returncode == 0, status.error
+    return enriched, raw
+
+
+@pytest.fixture
+def repaired(collector, tmp_path):
+    partial, _ = collect(
+        collector, week_args(collector, tmp_path), FakeSession(missing=[MISSING_DAY])
+    )
+    session = FakeSession()
+    enriched, raw = collect(
+        collector, week_args(collector, tmp_path, "--repair-missing-days"), session
+    )
+    return partial, enriched, raw, session
+
+
+def test_partial_week_records_the_missing_day(repaired):
+    partial, _, _, _ = repaired
+    assert [record["date"] for record in partial["missing_days"]] == [MISSING_DAY]
+
+
+def test_repair_fetches_only_the_missing_day(repaired):
+    _, enriched, _, session = repaired
+    top_calls = [url for url in session.calls if "/top/" in url]
+    assert top_calls and all(url.endswith("2024/03/27") for url in top_calls)
+    assert enriched["missing_days"] == []
+
+
+def test_repair_merges_views_into_existing_rows(repaired):
+    _, enriched, _, _ = repaired
+    for item in enriched["articles"]:
+        daily = {record["date"]: record["views"] for record in item["daily_views"]}
+        assert len(daily) == 7
+        assert sum(daily.values()) == item["views"]
+    by_title = {item["article"]: item for item in enriched["articles"]}
+    assert by_title["A_29"]["views"] == 7 * 2900 + sum(range(25, 32))
+
+
+def test_repair_matches_a_complete_collection(collector, tmp_path, repaired):
+    _, enriched, raw, _ = repaired
+    full, full_raw = collect(
+        collector, week_args(collector, tmp_path / "full"), FakeSession()
+    )
+    # Tied titles may come out in another order; the totals must agree.
+    assert {item["article"]: item["views"] for item in raw["articles"]} == {
+        item["article"]: item["views"] for item in full_raw["articles"]
+    }
+    assert [
+        (item["rank"], item["article"], item["views"]) for item in enriched["articles"]
+    ] == [(item["rank"], item["article"], item["views"]) for item in full["articles"]]
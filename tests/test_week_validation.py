@@ -0,0 +1,165 @@
+import json
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from week_validation import ValidationCache, validate_week, validate_weeks
+
+WEEK_KEY = "2024-13"
+DAYS = [(date(2024, 3, 25) + timedelta(days=offset)).isoformat() for offset in range(7)]
+
+
+def week_payloads(top=3):
+    header = {
+        "project": "it.wikipedia",
+        "access": "all-access",
+        "year": 2024,
+        "week": 13,
+        "start_date": DAYS[0],
+        "end_date": DAYS[-1],
+        "days": DAYS,
+        "available_days": DAYS,
+        "missing_days": [],
+        "complete": True,
+        "total_articles": 5,
+    }
+    raw_rows = [
+        {"rank": rank, "article": f"A_{rank}", "views": 7 * (60 - 10 * rank)}
+        for rank in range(1, 6)
+    ]
+    enriched_rows = [
+        dict(
+            row,
+            daily_views=[{"date": day, "views": row["views"] // 7} for day in DAYS],
+        )
+        for row in raw_rows[:top]
+    ]
+    return dict(header, articles=enriched_rows), dict(header, articles=raw_rows)
+
+
+def write_week(tmp_path, enriched, raw):
+    json_path = tmp_path / "json" / f"{WEEK_KEY}.json"
+    raw_path = tmp_path / "rawjson" / f"{WEEK_KEY}.json"
+    for path, payload in ((json_path, enriched), (raw_path, raw)):
+        if payload is None:
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload), encoding="utf-8")
+    return json_path, raw_path
+
+
+def violations(tmp_path, enriched, raw, top=3):
+    json_path, raw_path = write_week(tmp_path, enriched, raw)
+    return validate_week(WEEK_KEY, str(json_path), str(raw_path), top)["violations"]
+
+
+def test_consistent_week_has_no_violations(tmp_path):
+    enriched, raw = week_payloads()
+    assert violations(tmp_path, enriched, raw) == []
+    assert violations(tmp_path, enriched, raw, top=None) == []
+
+
+def mutate_rank(enriched, raw):
+    enriched["articles"][1]["rank"] = 3
+
+
+def mutate_order(enriched, raw):
+    raw["articles"][3]["views"] = 1000
+
+
+def mutate_daily_sum(enriched, raw):
+    enriched["articles"][0]["daily_views"][2]["views"] += 1
+
+
+def mutate_daily_dates(enriched, raw):
+    enriched["articles"][0]["daily_views"].pop()
+
+
+def mutate_shared_field(enriched, raw):
+    raw["total_articles"] = 6
+    raw["articles"].append({"rank": 6, "article": "A_6", "views": 0})
+
+
+def mutate_top_rows(enriched, raw):
+    raw["articles"][0]["article"] = "Other"
+
+
+def mutate_missing_days(enriched, raw):
+    enriched["available_days"] = DAYS[:-1]
+
+
+def mutate_week_number(enriched, raw):
+    raw["week"] = 14
+
+
+@pytest.mark.parametrize(
+    "mutate, expected",
+    [
+        (mutate_rank, "json: row 2 (A_2) has rank 3"),
+        (mutate_order, "rawjson: rank 4 has more views than rank 3"),
+        (mutate_daily_sum, "json: rank 1 daily_views sum to 351, not 350"),
+        (mutate_daily_dates, "json: rank 1 has 6 daily_views instead of one per day (7)"),
+        (mutate_shared_field, "json/rawjson: total_articles differ"),
+        (mutate_top_rows, "json/rawjson: enriched rows are not the top of the raw ranking"),
+        (mutate_missing_days, "json: available and missing days do not cover the week"),
+        (mutate_week_number, "rawjson: year/week 2024-14 do not match the file name"),
+    ],
+)
+def test_inconsistencies_are_reported(tmp_path, mutate, expected):
+    enriched, raw = week_payloads()
+    mutate(enriched, raw)
+    assert expected in violations(tmp_path, enriched, raw)
+
+
+def test_top_count_is_checked(tmp_path):
+    enriched, raw = week_payloads(top=2)
+    assert violations(tmp_path, enriched, raw) == [
+        "json: 2 article(s), expected 3 for --top 3"
+    ]
+
+
+def test_missing_raw_file(tmp_path):
+    enriched, _ = week_payloads()
+    assert violations(tmp_path, enriched, None) == ["rawjson: missing raw JSON"]
+
+
+def test_unreadable_json(tmp_path):
+    enriched, raw = week_payloads()
+    json_path, raw_path = write_week(tmp_path, enriched, raw)
+    json_path.write_text("{", encoding="utf-8")
+    result = validate_week(WEEK_KEY, str(json_path), str(raw_path), 3)
+    assert result["violations"][0].startswith("json: unreadable JSON")
+
+
+def test_cache_skips_unchanged_weeks(tmp_path):
+    enriched, raw = week_payloads()
+    json_path, raw_path = write_week(tmp_path, enriched, raw)
+    cache_path = tmp_path / "validation.json"
+    args = ([WEEK_KEY], str(json_path.parent), str(raw_path.parent), 3)
+
+    cache = ValidationCache(str(cache_path))
+    assert validate_weeks(*args, cache=cache, workers=1) == ({WEEK_KEY: []}, 1)
+    cache.save()
+    cache = ValidationCache(str(cache_path))
+    assert validate_weeks(*args, cache=cache, workers=1) == ({WEEK_KEY: []}, 0)
+
+    mutate_daily_sum(enriched, raw)
+    write_week(tmp_path, enriched, None)
+    stat = json_path.stat()
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    results, checked = validate_weeks(*args, cache=cache, workers=1)
+    assert checked == 1
+    assert results[WEEK_KEY] == ["json: rank 1 daily_views sum to 351, not 350"]
+
+
+def test_cache_keeps_weeks_with_a_missing_file(tmp_path):
+    enriched, _ = week_payloads()
+    json_path, raw_path = write_week(tmp_path, enriched, None)
+    cache = ValidationCache(str(tmp_path / "validation.json"))
+    args = ([WEEK_KEY], str(json_path.parent), str(raw_path.parent), 3)
+
+    assert validate_weeks(*args, cache=cache, workers=1)[1] == 1
+    results, checked = validate_weeks(*args, cache=cache, workers=1)
+    assert checked == 0
+    assert results[WEEK_KEY] == ["rawjson: missing raw JSON"]
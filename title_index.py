@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Canonical page titles and integer title ids.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Dict, Iterator, List, Optional
+
+
+def normalize_title(title: object) -> str:
+    return str(title).replace(" ", "_")
+
+
+class TitleIndex:
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._titles: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._titles)
+
+    def intern(self, title: object) -> int:
+        canonical = normalize_title(title)
+        title_id = self._ids.get(canonical)
+        if title_id is None:
+            title_id = len(self._titles)
+            self._ids[canonical] = title_id
+            self._titles.append(sys.intern(canonical))
+        return title_id
+
+    def lookup(self, title: object) -> Optional[int]:
+        return self._ids.get(normalize_title(title))
+
+    def title(self, title_id: int) -> str:
+        return self._titles[title_id]
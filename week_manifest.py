@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Manifest of weekly JSON outputs, so gaps can be checked without parsing them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 2
+
+_write_lock = threading.Lock()
+
+
+def default_manifest_path(json_dir: str) -> Path:
+    return Path(json_dir) / MANIFEST_NAME
+
+
+def build_entry(
+    stat: os.stat_result, content: bytes, payload: Any, raw_present: bool
+) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "readable": isinstance(payload, dict),
+        "raw": raw_present,
+    }
+    if not isinstance(payload, dict):
+        return entry
+    missing_days = payload.get("missing_days", [])
+    if not isinstance(missing_days, list):
+        missing_days = []
+    missing_status = {
+        str(item.get("date")): str(item.get("status", "request-error"))
+        for item in missing_days
+        if isinstance(item, dict) and item.get("date")
+    }
+    missing_dates = list(missing_status)
+    articles = payload.get("articles", [])
+    entry.update(
+        {
+            "complete": bool(payload.get("complete", not missing_dates)),
+            "missing_days": len(missing_dates),
+            "missing_dates": missing_dates,
+            "missing_status": missing_status,
+            "articles": len(articles) if isinstance(articles, list) else 0,
+        }
+    )
+    return entry
+
+
+class WeekManifest:
+    def __init__(
+        self, json_dir: str, raw_json_dir: str, path: Optional[str] = None
+    ) -> None:
+        self.json_dir = Path(json_dir)
+        self.raw_json_dir = Path(raw_json_dir)
+        self.path = Path(path) if path else default_manifest_path(json_dir)
+        self.weeks: Dict[str, Dict[str, Any]] = {}
+        self.reparsed = 0
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return
+        weeks = data.get("weeks")
+        if isinstance(weeks, dict):
+            self.weeks = {
+                str(key): value for key, value in weeks.items() if isinstance(value, dict)
+            }
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {"version": MANIFEST_VERSION, "weeks": dict(sorted(self.weeks.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def week_path(self, week_key: str) -> Path:
+        return self.json_dir / f"{week_key}.json"
+
+    def raw_week_path(self, week_key: str) -> Path:
+        return self.raw_json_dir / f"{week_key}.json"
+
+    def entry(self, week_key: str) -> Optional[Dict[str, Any]]:
+        # Files whose size and mtime match the manifest are not read again.
+        path = self.week_path(week_key)
+        try:
+            stat = path.stat()
+        except OSError:
+            if self.weeks.pop(week_key, None) is not None:
+                self.dirty = True
+            return None
+        raw_present = self.raw_week_path(week_key).exists()
+        entry = self.weeks.get(week_key)
+        if (
+            entry is not None
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            if entry.get("raw") != raw_present:
+                entry["raw"] = raw_present
+                self.dirty = True
+            return entry
+
+        try:
+            content = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            payload = json.loads(content.decode("utf-8"))
+        except ValueError:
+            payload = None
+        entry = build_entry(stat, content, payload, raw_present)
+        self.weeks[week_key] = entry
+        self.reparsed += 1
+        self.dirty = True
+        return entry
+
+    def record(self, week_key: str, payload: Dict[str, Any]) -> None:
+        path = self.week_path(week_key)
+        stat = path.stat()
+        content = path.read_bytes()
+        self.weeks[week_key] = build_entry(
+            stat, content, payload, self.raw_week_path(week_key).exists()
+        )
+        self.dirty = True
+
+
+def record_week(
+    json_dir: str,
+    raw_json_dir: str,
+    week_key: str,
+    payload: Dict[str, Any],
+    path: Optional[str] = None,
+) -> None:
+    # Concurrent writers may still race across processes; a lost entry is only
+    # re-parsed on the next read because its stat no longer matches.
+    with _write_lock:
+        manifest = WeekManifest(json_dir, raw_json_dir, path)
+        manifest.record(week_key, payload)
+        manifest.save()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Consistency checks for weekly JSON files and their raw JSON counterparts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_VALIDATION_CACHE = ".cache/validation.json"
+VALIDATION_CACHE_VERSION = 1
+SHARED_FIELDS = (
+    "project",
+    "access",
+    "year",
+    "week",
+    "start_date",
+    "end_date",
+    "days",
+    "available_days",
+    "missing_days",
+    "total_articles",
+)
+
+Signature = Optional[Tuple[int, int, str]]
+
+
+def file_stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def read_file(path: Path) -> Tuple[Signature, Optional[bytes]]:
+    try:
+        stat = path.stat()
+        content = path.read_bytes()
+    except OSError:
+        return None, None
+    return (stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest()), content
+
+
+def parse_payload(content: bytes, label: str, violations: List[str]) -> Optional[Dict[str, Any]]:
+    try:
+        payload = json.loads(content.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError) as exc:
+        violations.append(f"{label}: unreadable JSON ({exc})")
+        return None
+    if not isinstance(payload, dict):
+        violations.append(f"{label}: top level is not a JSON object")
+        return None
+    return payload
+
+
+def check_ranking(label: str, articles: List[Any], violations: List[str]) -> bool:
+    previous_views: Optional[int] = None
+    for position, item in enumerate(articles, start=1):
+        if not isinstance(item, dict) or not item.get("article"):
+            violations.append(f"{label}: row {position} has no article title")
+            return False
+        if item.get("rank") != position:
+            violations.append(
+                f"{label}: row {position} ({item['article']}) has rank {item.get('rank')}"
+            )
+            return False
+        views = item.get("views")
+        if not isinstance(views, int):
+            violations.append(f"{label}: rank {position} has non-integer views")
+            return False
+        if previous_views is not None and views > previous_views:
+            violations.append(f"{label}: rank {position} has more views than rank {position - 1}")
+            return False
+        previous_views = views
+    return True
+
+
+def check_week_fields(
+    label: str, payload: Dict[str, Any], year: int, week: int, violations: List[str]
+) -> None:
+    if payload.get("year") != year or payload.get("week") != week:
+        violations.append(
+            f"{label}: year/week {payload.get('year')}-{payload.get('week')} "
+            "do not match the file name"
+        )
+    monday = date.fromisocalendar(year, week, 1)
+    expected_days = [(monday + timedelta(days=offset)).isoformat() for offset in range(7)]
+    if payload.get("start_date") != expected_days[0] or payload.get("end_date") != expected_days[-1]:
+        violations.append(
+            f"{label}: dates {payload.get('start_date')} -> {payload.get('end_date')} "
+            f"are not {expected_days[0]} -> {expected_days[-1]}"
+        )
+    days = payload.get("days")
+    if days != expected_days:
+        violations.append(f"{label}: days are not the 7 days of the week")
+        return
+    # Weeks written before missing-day tracking have neither field.
+    if "available_days" not in payload and "missing_days" not in payload:
+        return
+    available = payload.get("available_days")
+    missing = payload.get("missing_days")
+    if not isinstance(available, list) or not isinstance(missing, list):
+        violations.append(f"{label}: available_days/missing_days are not lists")
+        return
+    missing_dates = [item.get("date") for item in missing if isinstance(item, dict)]
+    if sorted(available + missing_dates) != expected_days:
+        violations.append(f"{label}: available and missing days do not cover the week")
+    if payload.get("complete") != (not missing_dates):
+        violations.append(f"{label}: complete={payload.get('complete')} but {len(missing_dates)} missing day(s)")
+
+
+def check_daily_views(label: str, item: Dict[str, Any], days: List[str], violations: List[str]) -> bool:
+    daily_views = item.get("daily_views")
+    if not isinstance(daily_views, list):
+        violations.append(f"{label}: rank {item['rank']} has no daily_views")
+        return False
+    dates = [entry.get("date") if isinstance(entry, dict) else None for entry in daily_views]
+    if dates != days:
+        violations.append(
+            f"{label}: rank {item['rank']} has {len(daily_views)} daily_views "
+            f"instead of one per day ({len(days)})"
+        )
+        return False
+    total = sum(int(entry.get("views") or 0) for entry in daily_views)
+    if total != item["views"]:
+        violations.append(
+            f"{label}: rank {item['rank']} daily_views sum to {total}, not {item['views']}"
+        )
+        return False
+    return True
+
+
+def validate_week(
+    week_key: str,
+    json_path: str,
+    raw_path: str,
+    top: Optional[int],
+    known: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    json_signature, json_content = read_file(Path(json_path))
+    raw_signature, raw_content = read_file(Path(raw_path))
+    result: Dict[str, Any] = {
+        "json": json_signature,
+        "raw": raw_signature,
+        "top": top,
+    }
+    # Touched but unchanged files keep their previous result.
+    if (
+        known is not None
+        and known.get("top") == top
+        and json_signature is not None
+        and raw_signature is not None
+        and known.get("json") is not None
+        and known.get("raw") is not None
+        and known["json"][2] == json_signature[2]
+        and known["raw"][2] == raw_signature[2]
+    ):
+        result["violations"] = list(known.get("violations", []))
+        return result
+
+    violations: List[str] = []
+    result["violations"] = violations
+    year, week = (int(part) for part in week_key.split("-"))
+    enriched = raw = None
+    if json_content is None:
+        violations.append("json: missing enriched JSON")
+    else:
+        enriched = parse_payload(json_content, "json", violations)
+    if raw_content is None:
+        violations.append("rawjson: missing raw JSON")
+    else:
+        raw = parse_payload(raw_content, "rawjson", violations)
+
+    for label, payload in (("json", enriched), ("rawjson", raw)):
+        if payload is None:
+            continue
+        check_week_fields(label, payload, year, week, violations)
+        if not isinstance(payload.get("articles"), list):
+            violations.append(f"{label}: articles is not a list")
+            if label == "json":
+                enriched = None
+            else:
+                raw = None
+
+    if enriched is not None:
+        articles = enriched["articles"]
+        total = enriched.get("total_articles")
+        if top is not None:
+            expected = min(top, total) if isinstance(total, int) else top
+            if len(articles) != expected:
+                violations.append(
+                    f"json: {len(articles)} article(s), expected {expected} for --top {top}"
+                )
+        elif isinstance(total, int) and len(articles) > total:
+            violations.append(f"json: {len(articles)} article(s) but total_articles is {total}")
+        if check_ranking("json", articles, violations) and isinstance(enriched.get("days"), list):
+            for item in articles:
+                if not check_daily_views("json", item, enriched["days"], violations):
+                    break
+
+    if raw is not None:
+        articles = raw["articles"]
+        if len(articles) != raw.get("total_articles"):
+            violations.append(
+                f"rawjson: {len(articles)} article(s) but total_articles is {raw.get('total_articles')}"
+            )
+        check_ranking("rawjson", articles, violations)
+
+    if enriched is not None and raw is not None:
+        differing = [name for name in SHARED_FIELDS if enriched.get(name) != raw.get(name)]
+        if differing:
+            violations.append(f"json/rawjson: {', '.join(differing)} differ")
+        head = [
+            (item.get("article"), item.get("views"))
+            for item in raw["articles"][: len(enriched["articles"])]
+            if isinstance(item, dict)
+        ]
+        rows = [
+            (item.get("article"), item.get("views"))
+            for item in enriched["articles"]
+            if isinstance(item, dict)
+        ]
+        if head != rows:
+            violations.append("json/rawjson: enriched rows are not the top of the raw ranking")
+    return result
+
+
+def _validate_task(task: Tuple[str, str, str, Optional[int], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    return validate_week(*task)
+
+
+class ValidationCache:
+    def __init__(self, path: str = DEFAULT_VALIDATION_CACHE) -> None:
+        self.path = Path(path)
+        self.weeks: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != VALIDATION_CACHE_VERSION:
+            return
+        weeks = data.get("weeks")
+        if isinstance(weeks, dict):
+            self.weeks = {
+                str(key): value for key, value in weeks.items() if isinstance(value, dict)
+            }
+
+    def fresh(
+        self, week_key: str, json_path: Path, raw_path: Path, top: Optional[int]
+    ) -> Optional[List[str]]:
+        # Size and mtime unchanged: the files are not even read. A file that
+        # was absent (null signature) and still is counts as unchanged.
+        entry = self.weeks.get(week_key)
+        if entry is None or entry.get("top") != top:
+            return None
+        for name, path in (("json", json_path), ("raw", raw_path)):
+            stat = file_stat(path)
+            signature = entry.get(name)
+            if stat is None and signature is None:
+                continue
+            if stat is None or signature is None or tuple(signature[:2]) != stat:
+                return None
+        return list(entry.get("violations", []))
+
+    def store(self, week_key: str, result: Dict[str, Any]) -> None:
+        self.weeks[week_key] = {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in result.items()
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {"version": VALIDATION_CACHE_VERSION, "weeks": dict(sorted(self.weeks.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def validate_weeks(
+    week_keys: Sequence[str],
+    json_dir: str,
+    raw_json_dir: str,
+    top: Optional[int],
+    cache: Optional[ValidationCache] = None,
+    workers: Optional[int] = None,
+) -> Tuple[Dict[str, List[str]], int]:
+    results: Dict[str, List[str]] = {}
+    tasks: List[Tuple[str, str, str, Optional[int], Optional[Dict[str, Any]]]] = []
+    for week_key in week_keys:
+        json_path = Path(json_dir) / f"{week_key}.json"
+        raw_path = Path(raw_json_dir) / f"{week_key}.json"
+        cached = cache.fresh(week_key, json_path, raw_path, top) if cache else None
+        if cached is not None:
+            results[week_key] = cached
+            continue
+        known = cache.weeks.get(week_key) if cache else None
+        tasks.append((week_key, str(json_path), str(raw_path), top, known))
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            for task, result in zip(tasks, executor.map(_validate_task, tasks, chunksize=chunksize)):
+                results[task[0]] = result["violations"]
+                if cache is not None:
+                    cache.store(task[0], result)
+    return {week_key: results[week_key] for week_key in week_keys}, len(tasks)
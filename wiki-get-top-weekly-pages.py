@@ -7,19 +7,41 @@ from __future__ import annotations
 
 import argparse
 import csv
+import heapq
 import json
 import sys
-from collections import defaultdict
-from datetime import date, timedelta
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.parse import quote
 
 import requests
 
+from aggregation import BACKENDS, StreamingAggregate, aggregate_daily_lists
+from daily_store import DailyStore, add_daily_store_arguments, daily_store_from_args
+from http_transport import add_transport_arguments, session_from_args
+from metadata_cache import (
+    KIND_DESCRIPTION,
+    KIND_LICENSE,
+    KIND_PAGEIMAGE,
+    MetadataStore,
+    add_metadata_cache_arguments,
+    metadata_store_from_args,
+)
+from pageviews_cache import DailyTopCache, add_cache_arguments, cache_from_args
+from stage_metrics import record_cache, stage, submit, submit_stage
+from title_index import normalize_title
+from week_manifest import record_week
+
 API_BASE = "https://wikimedia.org/api/rest_v1/metrics/pageviews/top"
 DEFAULT_PROJECT = "it.wikipedia"
 DEFAULT_ACCESS = "all-access"
+DEFAULT_FETCH_CONCURRENCY = 7
+DEFAULT_ENRICHMENT_CONCURRENCY = 4
 DEFAULT_USER_AGENT = (
     "it-wiki-top25-weekly/2.0 "
     "(https://github.com/michelemauri/it-wiki-top25-weekly)"
@@ -67,26 +89,49 @@ def render_progress(prefix: str, current: int, total: int, width: int = 28) -> N
     print(message, end=suffix, file=sys.stderr, flush=True)
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
-            "Aggregate daily top pageviews into a weekly ranking using the "
+            "Aggregate daily top pageviews into a weekly (or custom window) ranking using the "
             "Wikimedia REST API."
         )
     )
-    parser.add_argument("--year", type=int, required=True, help="ISO year")
-    parser.add_argument("--week", type=int, required=True, help="ISO week number (1-53)")
+    parser.add_argument("--year", type=int, default=None, help="ISO year")
+    parser.add_argument("--week", type=int, default=None, help="ISO week number (1-53)")
+    parser.add_argument(
+        "--start-date",
+        type=parse_date_arg,
+        default=None,
+        help="First day (YYYY-MM-DD) of a custom aggregation window, instead of --year/--week",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=parse_date_arg,
+        default=None,
+        help="Last day (YYYY-MM-DD, inclusive) of a custom aggregation window",
+    )
+    parser.add_argument(
+        "--month",
+        type=parse_month_arg,
+        default=None,
+        help="Aggregate a whole calendar month (YYYY-MM) instead of an ISO week",
+    )
     parser.add_argument(
         "--project",
         type=str,
-        default=DEFAULT_PROJECT,
-        help="Wikimedia project, e.g. it.wikipedia",
+        nargs="+",
+        default=[DEFAULT_PROJECT],
+        help=(
+            "Wikimedia project, e.g. it.wikipedia; several projects collect every "
+            "project/access combination in one run"
+        ),
     )
     parser.add_argument(
         "--access",
         type=str,
-        default=DEFAULT_ACCESS,
-        help="Access type (all-access, desktop, mobile-app, mobile-web)",
+        nargs="+",
+        default=[DEFAULT_ACCESS],
+        help="Access type (all-access, desktop, mobile-app, mobile-web), one or more",
     )
     parser.add_argument(
         "--limit",
@@ -125,6 +170,23 @@ def parse_args() -> argparse.Namespace:
         default=1000,
         help="Thumbnail size in pixels for pageimages",
     )
+    parser.add_argument(
+        "--separate-metadata-requests",
+        action="store_true",
+        help=(
+            "Query pageterms and pageimages with two separate requests per batch "
+            "instead of one combined request"
+        ),
+    )
+    parser.add_argument(
+        "--enrichment-concurrency",
+        type=int,
+        default=DEFAULT_ENRICHMENT_CONCURRENCY,
+        help=(
+            "Maximum in-flight enrichment requests per host "
+            f"(default: {DEFAULT_ENRICHMENT_CONCURRENCY})"
+        ),
+    )
     parser.add_argument(
         "--output",
         "-o",
@@ -144,6 +206,18 @@ def parse_args() -> argparse.Namespace:
         default="docs/rawjson",
         help="Output directory for full weekly ranking JSON (before enrichment/limit)",
     )
+    parser.add_argument(
+        "--window-json-dir",
+        type=str,
+        default="docs/windows",
+        help="Default output directory for JSON files of custom windows and months",
+    )
+    parser.add_argument(
+        "--window-raw-json-dir",
+        type=str,
+        default="docs/rawwindows",
+        help="Output directory for full window ranking JSON (before enrichment/limit)",
+    )
     parser.add_argument(
         "--user-agent",
         type=str,
@@ -164,7 +238,120 @@ def parse_args() -> argparse.Namespace:
             "missing days are tracked in the JSON output"
         ),
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        default=DEFAULT_FETCH_CONCURRENCY,
+        help=(
+            "Maximum number of daily top endpoints fetched in parallel "
+            f"(default: {DEFAULT_FETCH_CONCURRENCY}, use 1 for sequential requests)"
+        ),
+    )
+    parser.add_argument(
+        "--aggregation-backend",
+        type=str,
+        choices=BACKENDS,
+        default="auto",
+        help=(
+            "Aggregation engine: numpy (columnar, requires numpy), python, or "
+            "auto to use numpy when installed (default: auto)"
+        ),
+    )
+    parser.add_argument(
+        "--from-raw",
+        action="store_true",
+        help=(
+            "Rebuild the enriched output from the existing raw weekly JSON: "
+            "re-filter, re-rank and re-limit locally, reuse rows already present "
+            "in the enriched JSON and enrich only titles new to the top-N"
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Update an in-progress week: only finished days are requested, days "
+            "already archived are read locally, rows already in the enriched JSON "
+            "keep their metadata and only titles new to the top-N are enriched"
+        ),
+    )
+    parser.add_argument(
+        "--repair-missing-days",
+        action="store_true",
+        help=(
+            "Repair an existing incomplete week: fetch only the days listed in "
+            "missing_days, merge them into the raw ranking, re-rank and enrich "
+            "only titles new to the top-N"
+        ),
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help=(
+            "Read daily top lists only from the raw daily archive and the local "
+            "cache, never from the Wikimedia API"
+        ),
+    )
+    add_transport_arguments(parser)
+    add_daily_store_arguments(parser)
+    add_cache_arguments(parser)
+    add_metadata_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    window = args.start_date is not None or args.end_date is not None
+    if args.month is not None:
+        if window:
+            parser.error("--month cannot be combined with --start-date/--end-date")
+        args.start_date, args.end_date = args.month
+        window = True
+    if window:
+        if args.start_date is None or args.end_date is None:
+            parser.error("--start-date and --end-date must be used together")
+        if args.end_date < args.start_date:
+            parser.error("--end-date must not be before --start-date")
+        if args.year is not None or args.week is not None:
+            parser.error("--year/--week cannot be combined with a custom window")
+        if args.from_raw or args.incremental or args.repair_missing_days:
+            parser.error(
+                "--from-raw, --incremental and --repair-missing-days only apply to ISO weeks"
+            )
+    elif args.year is None or args.week is None:
+        parser.error("--year and --week are required unless a window is given")
+    args.window = window
+    if args.repair_missing_days and (args.from_raw or args.incremental):
+        parser.error("--repair-missing-days cannot be combined with --from-raw or --incremental")
+    if args.repair_missing_days and args.format != "json":
+        parser.error("--repair-missing-days requires --format json")
+
+    args.projects = list(dict.fromkeys(args.project))
+    args.accesses = list(dict.fromkeys(args.access))
+    args.project = args.projects[0]
+    args.access = args.accesses[0]
+    args.batch = len(args.projects) * len(args.accesses) > 1
+    if args.batch:
+        if window or args.from_raw or args.incremental or args.repair_missing_days:
+            parser.error(
+                "several projects/access types can only be collected for a full ISO week"
+            )
+        if args.output:
+            parser.error("--output cannot be used with several projects/access types")
+    return args
+
+
+def parse_date_arg(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def parse_month_arg(value: str) -> Tuple[date, date]:
+    try:
+        start = datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid month '{value}', expected YYYY-MM")
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start, next_month - timedelta(days=1)
 
 
 def week_dates(year: int, week: int) -> Tuple[date, date, List[date]]:
@@ -174,13 +361,48 @@ def week_dates(year: int, week: int) -> Tuple[date, date, List[date]]:
     return start, end, days
 
 
+def window_dates(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
 def fetch_daily_top(
     session: requests.Session,
     project: str,
     access: str,
     day: date,
     timeout: float,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    offline: bool = False,
 ) -> List[Dict[str, object]]:
+    if archive is not None:
+        archived = archive.load(project, access, day)
+        if archived is not None:
+            record_cache(hits=1)
+            return archived
+
+    if cache is not None:
+        cached = cache.get(project, access, day)
+        if cached is not None:
+            record_cache(hits=1)
+        if cached is not None and cached.missing:
+            raise DailyTopFetchError(
+                day,
+                cached.error or f"Request failed for {day.isoformat()}: 404",
+                status_code=404,
+                detail=cached.detail,
+            )
+        if cached is not None:
+            if archive is not None:
+                archive.save(project, access, day, cached.articles)
+            return cached.articles
+
+    if offline:
+        raise DailyTopFetchError(
+            day, f"No archived daily data for {day.isoformat()} (offline mode)"
+        )
+
+    record_cache(misses=1)
     url = f"{API_BASE}/{project}/{access}/{day:%Y/%m/%d}"
     try:
         response = session.get(url, timeout=timeout)
@@ -190,9 +412,12 @@ def fetch_daily_top(
         detail = ""
         if exc.response is not None:
             detail = exc.response.text.strip().replace("\n", " ")
+        message = f"Request failed for {day.isoformat()}: {exc}"
+        if cache is not None and status_code == 404:
+            cache.put_missing(project, access, day, detail[:180], message)
         raise DailyTopFetchError(
             day,
-            f"Request failed for {day.isoformat()}: {exc}",
+            message,
             status_code=status_code,
             detail=detail[:180],
         ) from exc
@@ -215,52 +440,167 @@ def fetch_daily_top(
     if not items or "articles" not in items[0]:
         raise DailyTopFetchError(day, f"Unexpected response for {day.isoformat()}")
 
-    return items[0]["articles"]
+    articles = items[0]["articles"]
+    if archive is not None:
+        archive.save(project, access, day, articles)
+    if cache is not None:
+        cache.put_articles(project, access, day, articles)
+    return articles
 
 
-def aggregate_weekly(daily_lists: Iterable[List[Dict[str, object]]]) -> Dict[str, int]:
-    totals: Dict[str, int] = defaultdict(int)
-    for daily in daily_lists:
-        for entry in daily:
-            article = entry.get("article")
-            if not article:
-                continue
-            try:
-                views = int(entry.get("views", 0))
-            except (TypeError, ValueError):
-                continue
-            totals[str(article)] += views
-    return totals
+DailyTopResult = Union[List[Dict[str, object]], DailyTopFetchError]
 
 
-def build_day_maps(daily_lists: Iterable[List[Dict[str, object]]]) -> List[Dict[str, int]]:
-    day_maps: List[Dict[str, int]] = []
-    for daily in daily_lists:
-        day_map: Dict[str, int] = {}
-        for entry in daily:
-            article = entry.get("article")
-            if not article:
-                continue
-            try:
-                views = int(entry.get("views", 0))
-            except (TypeError, ValueError):
+def iter_fetch_tasks(
+    session: requests.Session,
+    tasks: List[Tuple[str, str, date]],
+    timeout: float,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    offline: bool = False,
+) -> Iterator[Tuple[int, DailyTopResult]]:
+    total_tasks = len(tasks)
+    workers = max(1, min(concurrency, total_tasks))
+
+    def fetch_one(task: Tuple[str, str, date]) -> DailyTopResult:
+        project, access, day = task
+        try:
+            return fetch_daily_top(
+                session, project, access, day, timeout, cache, archive, offline
+            )
+        except DailyTopFetchError as exc:
+            return exc
+
+    if workers == 1:
+        for index, task in enumerate(tasks):
+            render_progress("Daily top pages", index + 1, total_tasks)
+            yield index, fetch_one(task)
+        return
+
+    pending_tasks = iter(enumerate(tasks))
+    completed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for index, task in islice(pending_tasks, workers):
+            futures[submit(executor, fetch_one, task)] = index
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                completed += 1
+                render_progress("Daily top pages", completed, total_tasks)
+                yield index, future.result()
+            for index, task in islice(pending_tasks, len(done)):
+                futures[submit(executor, fetch_one, task)] = index
+
+
+def iter_daily_tops(
+    session: requests.Session,
+    project: str,
+    access: str,
+    days: List[date],
+    timeout: float,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    offline: bool = False,
+) -> Iterator[Tuple[int, DailyTopResult]]:
+    return iter_fetch_tasks(
+        session,
+        [(project, access, day) for day in days],
+        timeout,
+        concurrency,
+        cache,
+        archive,
+        offline,
+    )
+
+
+def fetch_daily_lists(
+    session: requests.Session,
+    project: str,
+    access: str,
+    days: List[date],
+    timeout: float,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    offline: bool = False,
+) -> List[DailyTopResult]:
+    results: Dict[int, DailyTopResult] = dict(
+        iter_daily_tops(
+            session,
+            project,
+            access,
+            days,
+            timeout,
+            concurrency,
+            cache,
+            archive,
+            offline,
+        )
+    )
+    return [results[index] for index in range(len(days))]
+
+
+def fetch_daily_batch(
+    session: requests.Session,
+    combinations: List[Tuple[str, str]],
+    days: List[date],
+    timeout: float,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    offline: bool = False,
+) -> Dict[Tuple[str, str], List[DailyTopResult]]:
+    tasks = [(project, access, day) for project, access in combinations for day in days]
+    results: Dict[int, DailyTopResult] = dict(
+        iter_fetch_tasks(session, tasks, timeout, concurrency, cache, archive, offline)
+    )
+    batch: Dict[Tuple[str, str], List[DailyTopResult]] = {}
+    for index, (project, access, _) in enumerate(tasks):
+        batch.setdefault((project, access), []).append(results[index])
+    return batch
+
+
+def rank_totals(
+    totals: Dict[str, int],
+    limit: int,
+    exclude_stopwords: bool = False,
+    include_all: bool = True,
+    ordered: bool = False,
+) -> Tuple[List[Dict[str, object]], List[Dict[str, object]], int]:
+    # ordered: totals already iterate by descending views, ties in first-seen
+    # order, as the aggregation backends return them; they are not sorted again.
+    kept = 0
+
+    def candidates() -> Iterable[Tuple[str, int]]:
+        nonlocal kept
+        for title, views in totals.items():
+            if exclude_stopwords and is_excluded_title(title):
                 continue
-            title = str(article)
-            day_map[title] = views
-            day_map[title.replace(" ", "_")] = views
-            day_map[title.replace("_", " ")] = views
-        day_maps.append(day_map)
-    return day_maps
-
-
-def rank_articles(totals: Dict[str, int], limit: int) -> List[Dict[str, object]]:
-    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
-    if limit:
-        ranked = ranked[:limit]
-    return [
+            kept += 1
+            yield title, views
+
+    if ordered:
+        rows = list(candidates())
+        if limit and not include_all:
+            rows = rows[:limit]
+    elif include_all or not limit:
+        rows = sorted(candidates(), key=itemgetter(1), reverse=True)
+    else:
+        rows = heapq.nlargest(limit, candidates(), key=itemgetter(1))
+
+    ranked_all = [
         {"rank": index + 1, "article": article, "views": views}
-        for index, (article, views) in enumerate(ranked)
+        for index, (article, views) in enumerate(rows)
     ]
+    top = ranked_all[:limit] if limit else ranked_all
+    ranked = [dict(item) for item in top]
+    if not include_all:
+        ranked_all = []
+    return ranked_all, ranked, kept
 
 
 def google_news_url(title: str, start_date: date, end_date: date) -> str:
@@ -315,14 +655,6 @@ def is_excluded_title(title: str) -> bool:
     return normalized.startswith(STOPWORD_PREFIXES)
 
 
-def filter_totals(totals: Dict[str, int]) -> Dict[str, int]:
-    return {
-        title: views
-        for title, views in totals.items()
-        if not is_excluded_title(title)
-    }
-
-
 def chunked(values: List[str], size: int) -> Iterable[List[str]]:
     for offset in range(0, len(values), size):
         yield values[offset : offset + size]
@@ -339,18 +671,26 @@ def fetch_descriptions(
     project: str,
     titles: List[str],
     timeout: float,
+    store: Optional[MetadataStore] = None,
+    progress: bool = True,
 ) -> Dict[str, str]:
+    descriptions: Dict[str, str] = {}
+    if store is not None:
+        cached, titles = store.lookup(KIND_DESCRIPTION, project, titles)
+        descriptions.update(
+            {normalize_title(title): str(value) for title, value in cached.items()}
+        )
     if not titles:
-        return {}
+        return descriptions
 
     api_url = project_api_url(project)
 
-    descriptions: Dict[str, str] = {}
     total_batches = (len(titles) + MAX_TITLES_PER_REQUEST - 1) // MAX_TITLES_PER_REQUEST
     batch_index = 0
     for batch in chunked(titles, MAX_TITLES_PER_REQUEST):
         batch_index += 1
-        render_progress("Descriptions", batch_index, total_batches)
+        if progress:
+            render_progress("Descriptions", batch_index, total_batches)
         params = {
             "action": "query",
             "format": "json",
@@ -374,9 +714,17 @@ def fetch_descriptions(
             terms = page.get("terms", {})
             if "description" in terms and terms["description"]:
                 description = str(terms["description"][0])
-            descriptions[title] = description
-            descriptions[title.replace(" ", "_")] = description
-
+            descriptions[normalize_title(title)] = description
+
+    if store is not None:
+        store.store(
+            KIND_DESCRIPTION,
+            project,
+            {
+                title: descriptions.get(normalize_title(title), "")
+                for title in titles
+            },
+        )
     return descriptions
 
 
@@ -386,17 +734,24 @@ def fetch_pageimages(
     titles: List[str],
     thumbsize: int,
     timeout: float,
+    store: Optional[MetadataStore] = None,
+    progress: bool = True,
 ) -> Dict[str, Dict[str, str]]:
+    images: Dict[str, Dict[str, str]] = {}
+    scope = f"{project}|{thumbsize}"
+    if store is not None:
+        cached, titles = store.lookup(KIND_PAGEIMAGE, scope, titles)
+        images.update({normalize_title(title): value for title, value in cached.items()})
     if not titles:
-        return {}
+        return images
 
     api_url = project_api_url(project)
-    images: Dict[str, Dict[str, str]] = {}
     total_batches = (len(titles) + MAX_TITLES_PER_REQUEST - 1) // MAX_TITLES_PER_REQUEST
     batch_index = 0
     for batch in chunked(titles, MAX_TITLES_PER_REQUEST):
         batch_index += 1
-        render_progress("Page images", batch_index, total_batches)
+        if progress:
+            render_progress("Page images", batch_index, total_batches)
         params = {
             "action": "query",
             "format": "json",
@@ -424,26 +779,143 @@ def fetch_pageimages(
                 "image_filename": str(pageimage) if pageimage else "",
                 "image_url": str(source) if source else "",
             }
-            images[title] = record
-            images[title.replace(" ", "_")] = record
-
+            images[normalize_title(title)] = record
+
+    if store is not None:
+        store.store(
+            KIND_PAGEIMAGE,
+            scope,
+            {
+                title: images.get(normalize_title(title))
+                or {"image_filename": "", "image_url": ""}
+                for title in titles
+            },
+        )
     return images
 
 
+def fetch_page_metadata(
+    session: requests.Session,
+    project: str,
+    titles: List[str],
+    thumbsize: int,
+    timeout: float,
+    store: Optional[MetadataStore] = None,
+    progress: bool = True,
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, str]]]:
+    descriptions: Dict[str, str] = {}
+    images: Dict[str, Dict[str, str]] = {}
+    image_scope = f"{project}|{thumbsize}"
+    if store is not None:
+        cached_descriptions, description_misses = store.lookup(
+            KIND_DESCRIPTION, project, titles
+        )
+        cached_images, image_misses = store.lookup(KIND_PAGEIMAGE, image_scope, titles)
+        descriptions.update(
+            {normalize_title(title): str(value) for title, value in cached_descriptions.items()}
+        )
+        images.update(
+            {normalize_title(title): value for title, value in cached_images.items()}
+        )
+        missing = set(description_misses) | set(image_misses)
+        titles = [title for title in dict.fromkeys(titles) if title in missing]
+    if not titles:
+        return descriptions, images
+
+    api_url = project_api_url(project)
+    total_batches = (len(titles) + MAX_TITLES_PER_REQUEST - 1) // MAX_TITLES_PER_REQUEST
+    batch_index = 0
+    for batch in chunked(titles, MAX_TITLES_PER_REQUEST):
+        batch_index += 1
+        if progress:
+            render_progress("Page metadata", batch_index, total_batches)
+        params: Dict[str, str] = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "prop": "pageterms|pageimages",
+            "piprop": "thumbnail|name",
+            "pithumbsize": str(thumbsize),
+            "pilimit": str(MAX_TITLES_PER_REQUEST),
+            "titles": "|".join(batch),
+        }
+        while True:
+            try:
+                response = session.get(api_url, params=params, timeout=timeout)
+                response.raise_for_status()
+            except requests.RequestException as exc:
+                raise RuntimeError(f"Page metadata request failed: {exc}") from exc
+
+            payload = response.json()
+            pages = payload.get("query", {}).get("pages", [])
+            for page in pages:
+                title = page.get("title")
+                if not title:
+                    continue
+                key = normalize_title(title)
+                terms = page.get("terms", {})
+                if key not in descriptions or terms.get("description"):
+                    description = ""
+                    if "description" in terms and terms["description"]:
+                        description = str(terms["description"][0])
+                    descriptions[key] = description
+
+                pageimage = page.get("pageimage", "")
+                source = page.get("thumbnail", {}).get("source", "")
+                if key not in images or pageimage or source:
+                    images[key] = {
+                        "image_filename": str(pageimage) if pageimage else "",
+                        "image_url": str(source) if source else "",
+                    }
+
+            continuation = payload.get("continue")
+            if not continuation:
+                break
+            params = {**params, **continuation}
+
+    if store is not None:
+        store.store(
+            KIND_DESCRIPTION,
+            project,
+            {
+                title: descriptions.get(normalize_title(title), "")
+                for title in titles
+            },
+        )
+        store.store(
+            KIND_PAGEIMAGE,
+            image_scope,
+            {
+                title: images.get(normalize_title(title))
+                or {"image_filename": "", "image_url": ""}
+                for title in titles
+            },
+        )
+    return descriptions, images
+
+
 def fetch_image_licenses(
     session: requests.Session,
     filenames: List[str],
     timeout: float,
+    store: Optional[MetadataStore] = None,
+    progress: bool = True,
 ) -> Dict[str, Dict[str, str]]:
+    licenses: Dict[str, Dict[str, str]] = {}
+    if store is not None:
+        cached, filenames = store.lookup(KIND_LICENSE, "commons", filenames)
+        licenses.update(
+            {normalize_title(filename): value for filename, value in cached.items()}
+        )
     if not filenames:
-        return {}
+        return licenses
 
-    licenses: Dict[str, Dict[str, str]] = {}
     total_batches = (len(filenames) + MAX_TITLES_PER_REQUEST - 1) // MAX_TITLES_PER_REQUEST
     batch_index = 0
     for batch in chunked(filenames, MAX_TITLES_PER_REQUEST):
         batch_index += 1
-        render_progress("Image licenses", batch_index, total_batches)
+        if progress:
+            render_progress("Image licenses", batch_index, total_batches)
         titles = [f"File:{name}" for name in batch if name]
         if not titles:
             continue
@@ -477,13 +949,141 @@ def fetch_image_licenses(
                 "image_license": str(license_short),
                 "image_copyrighted": str(copyrighted),
             }
-            licenses[filename] = license_data
-            licenses[filename.replace(" ", "_")] = license_data
-            licenses[filename.replace("_", " ")] = license_data
-
+            licenses[normalize_title(filename)] = license_data
+
+    if store is not None:
+        store.store(
+            KIND_LICENSE,
+            "commons",
+            {
+                filename: licenses.get(normalize_title(filename))
+                or {"image_license": "", "image_copyrighted": ""}
+                for filename in filenames
+            },
+        )
     return licenses
 
 
+def fetch_enrichment(
+    session: requests.Session,
+    project: str,
+    titles: List[str],
+    thumbsize: int,
+    timeout: float,
+    store: Optional[MetadataStore] = None,
+    max_in_flight: int = DEFAULT_ENRICHMENT_CONCURRENCY,
+    separate_requests: bool = False,
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, str]], Dict[str, Dict[str, str]]]:
+    descriptions: Dict[str, str] = {}
+    images: Dict[str, Dict[str, str]] = {}
+    licenses: Dict[str, Dict[str, str]] = {}
+    batches = list(chunked(list(dict.fromkeys(titles)), MAX_TITLES_PER_REQUEST))
+    if not batches:
+        return descriptions, images, licenses
+
+    workers = max(1, max_in_flight)
+    pending_files: List[str] = []
+    queued_files = set()
+    with ThreadPoolExecutor(max_workers=workers) as project_pool, ThreadPoolExecutor(
+        max_workers=workers
+    ) as commons_pool:
+        description_futures = []
+        image_futures = {}
+        license_futures = []
+        for batch in batches:
+            if separate_requests:
+                description_futures.append(
+                    submit_stage(
+                        project_pool,
+                        "descriptions",
+                        fetch_descriptions,
+                        session,
+                        project,
+                        batch,
+                        timeout,
+                        store,
+                        progress=False,
+                    )
+                )
+                future = submit_stage(
+                    project_pool,
+                    "page_images",
+                    fetch_pageimages,
+                    session,
+                    project,
+                    batch,
+                    thumbsize,
+                    timeout,
+                    store,
+                    progress=False,
+                )
+            else:
+                future = submit_stage(
+                    project_pool,
+                    "page_metadata",
+                    fetch_page_metadata,
+                    session,
+                    project,
+                    batch,
+                    thumbsize,
+                    timeout,
+                    store,
+                    progress=False,
+                )
+            image_futures[future] = batch
+
+        for completed, future in enumerate(as_completed(image_futures), start=1):
+            render_progress("Page metadata", completed, len(image_futures))
+            if separate_requests:
+                batch_images = future.result()
+            else:
+                batch_descriptions, batch_images = future.result()
+                descriptions.update(batch_descriptions)
+            images.update(batch_images)
+            for title in image_futures[future]:
+                image = batch_images.get(normalize_title(title))
+                filename = image.get("image_filename", "") if image else ""
+                if filename and filename not in queued_files:
+                    queued_files.add(filename)
+                    pending_files.append(filename)
+            while len(pending_files) >= MAX_TITLES_PER_REQUEST:
+                license_batch = pending_files[:MAX_TITLES_PER_REQUEST]
+                del pending_files[:MAX_TITLES_PER_REQUEST]
+                license_futures.append(
+                    submit_stage(
+                        commons_pool,
+                        "licenses",
+                        fetch_image_licenses,
+                        session,
+                        license_batch,
+                        timeout,
+                        store,
+                        progress=False,
+                    )
+                )
+        if pending_files:
+            license_futures.append(
+                submit_stage(
+                    commons_pool,
+                    "licenses",
+                    fetch_image_licenses,
+                    session,
+                    pending_files,
+                    timeout,
+                    store,
+                    progress=False,
+                )
+            )
+
+        for future in description_futures:
+            descriptions.update(future.result())
+        for completed, future in enumerate(license_futures, start=1):
+            licenses.update(future.result())
+            render_progress("Image licenses", completed, len(license_futures))
+
+    return descriptions, images, licenses
+
+
 def resolve_output_path(
     fmt: str, output: Optional[str], year: int, week: int, json_dir: str
 ) -> Optional[str]:
@@ -504,6 +1104,20 @@ def resolve_raw_output_path(raw_json_dir: str, year: int, week: int) -> str:
     return str(output_dir / f"{year}-{week:02d}.json")
 
 
+def resolve_window_output_path(
+    fmt: str, output: Optional[str], start_date: date, end_date: date, json_dir: str
+) -> Optional[str]:
+    if output == "-":
+        return None
+    if output:
+        return output
+    if fmt == "json":
+        output_dir = Path(json_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return str(output_dir / f"{start_date.isoformat()}_{end_date.isoformat()}.json")
+    return f"window_data.{fmt}"
+
+
 def write_json(data: Dict[str, object], output_path: Optional[str]) -> None:
     if output_path:
         with open(output_path, "w", encoding="utf-8") as handle:
@@ -563,128 +1177,165 @@ def missing_day_record(exc: DailyTopFetchError) -> Dict[str, object]:
     }
 
 
-def main() -> int:
-    args = parse_args()
+def pending_day_record(day: date) -> Dict[str, object]:
+    return {
+        "date": day.isoformat(),
+        "status": "pending",
+        "error": f"Daily data for {day.isoformat()} is not published yet",
+        "detail": "",
+    }
 
-    try:
-        start_date, end_date, days = week_dates(args.year, args.week)
-    except ValueError as exc:
-        print(f"Invalid year/week: {exc}", file=sys.stderr)
-        return 2
 
-    output_path = resolve_output_path(
-        args.format, args.output, args.year, args.week, args.json_dir
-    )
+def print_cache_summary(cache: Optional[DailyTopCache]) -> None:
+    if cache is not None and cache.hits:
+        print(
+            f"Daily top cache: {cache.hits} hit(s), {cache.misses} miss(es).",
+            file=sys.stderr,
+        )
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": args.user_agent})
 
+def collect_daily_lists(
+    args: argparse.Namespace,
+    session: requests.Session,
+    days: List[date],
+    cache: Optional[DailyTopCache],
+    archive: Optional[DailyStore],
+    allow_missing_days: bool,
+    results: Optional[List[DailyTopResult]] = None,
+) -> Tuple[List[List[Dict[str, object]]], List[str], List[Dict[str, object]]]:
     daily_lists: List[List[Dict[str, object]]] = []
     available_days: List[str] = []
     missing_days: List[Dict[str, object]] = []
-    total_days = len(days)
-    for index, day in enumerate(days, start=1):
-        render_progress("Daily top pages", index, total_days)
-        try:
-            daily = fetch_daily_top(session, args.project, args.access, day, args.timeout)
-        except DailyTopFetchError as exc:
-            if args.allow_missing_days and exc.status_code == 404:
-                missing_days.append(missing_day_record(exc))
+    if results is None:
+        results = fetch_daily_lists(
+            session,
+            args.project,
+            args.access,
+            days,
+            args.timeout,
+            args.fetch_concurrency,
+            cache,
+            archive,
+            args.offline,
+        )
+        print_cache_summary(cache)
+    for day, result in zip(days, results):
+        if isinstance(result, DailyTopFetchError):
+            if allow_missing_days and result.status_code == 404:
+                missing_days.append(missing_day_record(result))
                 daily_lists.append([])
                 print(
                     f"Missing daily data for {day.isoformat()} (404); continuing.",
                     file=sys.stderr,
                 )
                 continue
-            print(str(exc), file=sys.stderr)
-            return 1
-        daily_lists.append(daily)
+            raise result
+        daily_lists.append(result)
         available_days.append(day.isoformat())
+    return daily_lists, available_days, missing_days
 
-    if not any(daily_lists):
-        print(
-            "No daily data available for this week; refusing to write an empty week.",
-            file=sys.stderr,
-        )
-        return 1
-    day_maps = build_day_maps(daily_lists)
 
-    totals = aggregate_weekly(daily_lists)
-    if args.exclude_stopwords:
-        totals = filter_totals(totals)
-    ranked_all = rank_articles(totals, 0)
-    ranked = rank_articles(totals, args.limit)
-    descriptions = fetch_descriptions(
-        session, args.project, [item["article"] for item in ranked], args.timeout
+def daily_views_records(days: List[date], views: List[int]) -> List[Dict[str, object]]:
+    return [{"date": day.isoformat(), "views": value} for day, value in zip(days, views)]
+
+
+def enrich_ranked(
+    args: argparse.Namespace,
+    session: requests.Session,
+    store: Optional[MetadataStore],
+    ranked: List[Dict[str, object]],
+    days: List[date],
+    daily_views: Callable[[str], List[int]],
+    start_date: date,
+    end_date: date,
+) -> None:
+    descriptions, pageimages, licenses = fetch_enrichment(
+        session,
+        args.project,
+        [str(item["article"]) for item in ranked],
+        args.thumbsize,
+        args.timeout,
+        store,
+        max_in_flight=args.enrichment_concurrency,
+        separate_requests=args.separate_metadata_requests,
     )
+    apply_enrichment(
+        args,
+        ranked,
+        days,
+        daily_views,
+        start_date,
+        end_date,
+        descriptions,
+        pageimages,
+        licenses,
+    )
+
+
+def apply_enrichment(
+    args: argparse.Namespace,
+    ranked: List[Dict[str, object]],
+    days: List[date],
+    daily_views: Callable[[str], List[int]],
+    start_date: date,
+    end_date: date,
+    descriptions: Dict[str, str],
+    pageimages: Dict[str, Dict[str, str]],
+    licenses: Dict[str, Dict[str, str]],
+) -> None:
     for item in ranked:
         article = str(item["article"])
-        daily_views = []
-        for day, day_map in zip(days, day_maps):
-            daily_views.append(
-                {"date": day.isoformat(), "views": day_map.get(article, 0)}
-            )
-        item["daily_views"] = daily_views
+        key = normalize_title(article)
+        item["daily_views"] = daily_views_records(days, daily_views(key))
         item["google_news_url"] = google_news_url(article, start_date, end_date)
         item["pageviews_url"] = pageviews_url(
             article, args.project, args.access, start_date, end_date
         )
         item["article_url"] = article_url(article, args.project)
-        description = descriptions.get(article)
-        if description is None:
-            description = descriptions.get(article.replace("_", " "), "")
-        item["description"] = description
+        item["description"] = descriptions.get(key, "")
         item["image_filename"] = ""
         item["image_url"] = ""
         item["image_commons_url"] = ""
         item["image_license"] = ""
         item["image_copyrighted"] = ""
 
-    pageimages = fetch_pageimages(
-        session,
-        args.project,
-        [item["article"] for item in ranked],
-        args.thumbsize,
-        args.timeout,
-    )
-    image_filenames = []
     for item in ranked:
-        article = str(item["article"])
-        image = pageimages.get(article)
-        if image is None:
-            image = pageimages.get(article.replace("_", " "), {})
+        image = pageimages.get(normalize_title(item["article"]))
         if image:
             item["image_filename"] = image.get("image_filename", "")
             item["image_url"] = image.get("image_url", "")
             item["image_commons_url"] = commons_file_url(item["image_filename"])
-            if item["image_filename"]:
-                image_filenames.append(item["image_filename"])
 
-    licenses = fetch_image_licenses(session, image_filenames, args.timeout)
     for item in ranked:
         filename = item.get("image_filename", "")
         if not filename:
             continue
-        license_info = licenses.get(filename, {})
+        license_info = licenses.get(normalize_title(filename), {})
         item["image_license"] = license_info.get("image_license", "")
         item["image_copyrighted"] = license_info.get("image_copyrighted", "")
 
-    output_data = {
-        "project": args.project,
-        "access": args.access,
-        "year": args.year,
-        "week": args.week,
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
-        "days": [day.isoformat() for day in days],
-        "available_days": available_days,
-        "complete": not missing_days,
-        "missing_days": missing_days,
-        "total_articles": len(totals),
-        "articles": ranked,
-    }
 
-    raw_output_data = {
+def load_json_file(path: Path) -> Optional[Dict[str, object]]:
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def week_output_data(
+    args: argparse.Namespace,
+    start_date: date,
+    end_date: date,
+    days: List[date],
+    available_days: List[str],
+    missing_days: List[Dict[str, object]],
+    total_articles: int,
+    articles: List[Dict[str, object]],
+) -> Dict[str, object]:
+    return {
         "project": args.project,
         "access": args.access,
         "year": args.year,
@@ -695,19 +1346,919 @@ def main() -> int:
         "available_days": available_days,
         "complete": not missing_days,
         "missing_days": missing_days,
-        "total_articles": len(totals),
-        "articles": ranked_all,
+        "total_articles": total_articles,
+        "articles": articles,
     }
 
+
+def week_outputs(
+    args: argparse.Namespace,
+    start_date: date,
+    end_date: date,
+    days: List[date],
+    available_days: List[str],
+    missing_days: List[Dict[str, object]],
+    total_articles: int,
+    ranked: List[Dict[str, object]],
+    ranked_all: List[Dict[str, object]],
+) -> Tuple[Dict[str, object], Dict[str, object]]:
+    output_data = week_output_data(
+        args,
+        start_date,
+        end_date,
+        days,
+        available_days,
+        missing_days,
+        total_articles,
+        ranked,
+    )
+    raw_output_data = week_output_data(
+        args,
+        start_date,
+        end_date,
+        days,
+        available_days,
+        missing_days,
+        total_articles,
+        ranked_all,
+    )
+    return output_data, raw_output_data
+
+
+def write_week_outputs(
+    args: argparse.Namespace,
+    output_data: Dict[str, object],
+    raw_output_data: Dict[str, object],
+    ranked: List[Dict[str, object]],
+    output_path: Optional[str],
+) -> Optional[str]:
+    if args.format != "json":
+        write_csv(ranked, output_path)
+        return None
+    raw_output_path = resolve_raw_output_path(args.raw_json_dir, args.year, args.week)
+    write_json(raw_output_data, raw_output_path)
+    write_json(output_data, output_path)
+    update_manifest(args, output_data)
+    return raw_output_path
+
+
+def update_manifest(args: argparse.Namespace, output_data: Dict[str, object]) -> None:
+    if args.output:
+        return
+    record_week(
+        args.json_dir, args.raw_json_dir, f"{args.year}-{args.week:02d}", output_data
+    )
+
+
+def load_previous_rows(output_path: Optional[str]) -> Dict[str, Dict[str, object]]:
+    previous: Dict[str, Dict[str, object]] = {}
+    existing = load_json_file(Path(output_path)) if output_path else None
+    if existing is not None and isinstance(existing.get("articles"), list):
+        for item in existing["articles"]:
+            if isinstance(item, dict) and item.get("article"):
+                previous[normalize_title(item["article"])] = item
+    return previous
+
+
+def reuse_previous_rows(
+    ranked: List[Dict[str, object]],
+    previous: Dict[str, Dict[str, object]],
+    refresh: Optional[Callable[[Dict[str, object]], Dict[str, object]]] = None,
+) -> List[Dict[str, object]]:
+    new_items: List[Dict[str, object]] = []
+    for position, item in enumerate(ranked):
+        old_item = previous.get(normalize_title(item["article"]))
+        if old_item is None or (refresh is None and old_item.get("views") != item["views"]):
+            new_items.append(item)
+            continue
+        reused = dict(old_item)
+        reused["rank"] = item["rank"]
+        if refresh is not None:
+            reused["views"] = item["views"]
+            reused.update(refresh(item))
+        ranked[position] = reused
+    return new_items
+
+
+def rederive_week(
+    args: argparse.Namespace,
+    session: requests.Session,
+    cache: Optional[DailyTopCache],
+    archive: Optional[DailyStore],
+    store: Optional[MetadataStore],
+    start_date: date,
+    end_date: date,
+    days: List[date],
+    output_path: Optional[str],
+) -> int:
+    raw_path = Path(args.raw_json_dir) / f"{args.year}-{args.week:02d}.json"
+    raw = load_json_file(raw_path)
+    if raw is None or not isinstance(raw.get("articles"), list):
+        print(
+            f"Cannot re-derive: {raw_path} is missing or unreadable; "
+            "run without --from-raw first.",
+            file=sys.stderr,
+        )
+        return 1
+    if raw.get("project", args.project) != args.project or raw.get(
+        "access", args.access
+    ) != args.access:
+        print(
+            f"Cannot re-derive: {raw_path} was built for another project/access.",
+            file=sys.stderr,
+        )
+        return 1
+
+    totals: Dict[str, int] = {}
+    for entry in raw["articles"]:
+        if isinstance(entry, dict) and entry.get("article"):
+            totals[str(entry["article"])] = int(entry.get("views", 0))
+    _, ranked, total_articles = rank_totals(
+        totals,
+        args.limit,
+        exclude_stopwords=args.exclude_stopwords,
+        include_all=False,
+    )
+
+    previous = load_previous_rows(output_path)
+    new_items = reuse_previous_rows(ranked, previous)
+
+    print(
+        f"Re-derived {len(ranked)} article(s) from {raw_path}; "
+        f"{len(ranked) - len(new_items)} reused, {len(new_items)} to enrich.",
+        file=sys.stderr,
+    )
+    available_days = raw.get("available_days", [day.isoformat() for day in days])
+    missing_days = raw.get("missing_days", [])
+    if new_items:
+        # Daily views of the new rows come from the archive and the cache; only
+        # the raw ranking's available days that neither holds are fetched.
+        wanted = [day for day in days if day.isoformat() in set(available_days)]
+        results = dict(
+            zip(
+                wanted,
+                fetch_daily_lists(
+                    session,
+                    args.project,
+                    args.access,
+                    wanted,
+                    args.timeout,
+                    args.fetch_concurrency,
+                    cache,
+                    archive,
+                    offline=True,
+                ),
+            )
+        )
+        refetch = [day for day in wanted if isinstance(results[day], DailyTopFetchError)]
+        if refetch and not args.offline:
+            print(
+                f"Re-derive: {len(refetch)} day(s) not in the daily archive or cache; "
+                "fetching them.",
+                file=sys.stderr,
+            )
+            results.update(
+                zip(
+                    refetch,
+                    fetch_daily_lists(
+                        session,
+                        args.project,
+                        args.access,
+                        refetch,
+                        args.timeout,
+                        args.fetch_concurrency,
+                        cache,
+                        archive,
+                    ),
+                )
+            )
+        print_cache_summary(cache)
+        for day in wanted:
+            if isinstance(results[day], DailyTopFetchError):
+                print(
+                    f"Cannot re-derive daily views: {results[day]}",
+                    file=sys.stderr,
+                )
+                return 1
+        aggregate = aggregate_daily_lists(
+            [results.get(day, []) for day in days], args.aggregation_backend
+        )
+        enrich_ranked(
+            args,
+            session,
+            store,
+            new_items,
+            days,
+            aggregate.daily_views,
+            start_date,
+            end_date,
+        )
+
+    output_data = week_output_data(
+        args,
+        start_date,
+        end_date,
+        days,
+        list(available_days),
+        list(missing_days),
+        total_articles,
+        ranked,
+    )
     if args.format == "json":
-        raw_output_path = resolve_raw_output_path(args.raw_json_dir, args.year, args.week)
-        write_json(raw_output_data, raw_output_path)
         write_json(output_data, output_path)
+        update_manifest(args, output_data)
     else:
         write_csv(ranked, output_path)
+    return 0
+
+
+def collect_window(
+    args: argparse.Namespace,
+    session: requests.Session,
+    cache: Optional[DailyTopCache],
+    archive: Optional[DailyStore],
+    store: Optional[MetadataStore],
+) -> int:
+    start_date, end_date = args.start_date, args.end_date
+    days = window_dates(start_date, end_date)
+    output_path = resolve_window_output_path(
+        args.format, args.output, start_date, end_date, args.window_json_dir
+    )
+
+    # Days are folded into per-title totals as they arrive, in day order so
+    # ties rank exactly as in the weekly collector. Without an archive or a
+    # cache the days could not be read again, so their arrays are kept.
+    aggregate = StreamingAggregate(
+        len(days), keep_days=archive is None and cache is None
+    )
+    buffered: Dict[int, DailyTopResult] = {}
+    next_position = 0
+    available_days: List[str] = []
+    missing_days: List[Dict[str, object]] = []
+    for position, result in iter_daily_tops(
+        session,
+        args.project,
+        args.access,
+        days,
+        args.timeout,
+        args.fetch_concurrency,
+        cache,
+        archive,
+        args.offline,
+    ):
+        buffered[position] = result
+        while next_position in buffered:
+            result = buffered.pop(next_position)
+            day = days[next_position]
+            next_position += 1
+            if isinstance(result, DailyTopFetchError):
+                if args.allow_missing_days and result.status_code == 404:
+                    missing_days.append(missing_day_record(result))
+                    print(
+                        f"Missing daily data for {day.isoformat()} (404); continuing.",
+                        file=sys.stderr,
+                    )
+                    continue
+                print(str(result), file=sys.stderr)
+                return 1
+            aggregate.add_day(next_position - 1, result)
+            available_days.append(day.isoformat())
+    if not available_days:
+        print_cache_summary(cache)
+        print(
+            "No daily data available for this window; refusing to write an empty window.",
+            file=sys.stderr,
+        )
+        return 1
+
+    ranked_all, ranked, total_articles = rank_totals(
+        aggregate.totals(ordered=True),
+        args.limit,
+        exclude_stopwords=args.exclude_stopwords,
+        include_all=args.format == "json",
+        ordered=True,
+    )
+    second_pass = not aggregate.keeps_days
+    aggregate.select(str(item["article"]) for item in ranked)
+    if second_pass:
+        # Second pass over the available days, now served by the archive or
+        # the cache, for the daily views of the selected rows only.
+        positions = {day.isoformat(): position for position, day in enumerate(days)}
+        available = [date.fromisoformat(value) for value in available_days]
+        for position, result in iter_daily_tops(
+            session,
+            args.project,
+            args.access,
+            available,
+            args.timeout,
+            args.fetch_concurrency,
+            cache,
+            archive,
+            args.offline,
+        ):
+            if isinstance(result, DailyTopFetchError):
+                print(str(result), file=sys.stderr)
+                return 1
+            aggregate.add_selected(positions[available_days[position]], result)
+    print_cache_summary(cache)
+    enrich_ranked(
+        args,
+        session,
+        store,
+        ranked,
+        days,
+        aggregate.daily_views,
+        start_date,
+        end_date,
+    )
+
+    output_data = week_output_data(
+        args,
+        start_date,
+        end_date,
+        days,
+        available_days,
+        missing_days,
+        total_articles,
+        ranked,
+    )
+    if args.format == "json":
+        raw_output_dir = Path(args.window_raw_json_dir)
+        raw_output_dir.mkdir(parents=True, exist_ok=True)
+        write_json(
+            week_output_data(
+                args,
+                start_date,
+                end_date,
+                days,
+                available_days,
+                missing_days,
+                total_articles,
+                ranked_all,
+            ),
+            str(raw_output_dir / f"{start_date.isoformat()}_{end_date.isoformat()}.json"),
+        )
+        write_json(output_data, output_path)
+    else:
+        write_csv(ranked, output_path)
+    return 0
+
+
+@dataclass
+class CollectStatus:
+    returncode: int = 0
+    error: str = ""
+    output_path: Optional[str] = None
+    raw_output_path: Optional[str] = None
+    missing_days: List[Dict[str, object]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def complete(self) -> bool:
+        return self.ok and not self.missing_days
+
+
+@dataclass
+class PreparedWeek:
+    args: argparse.Namespace
+    start_date: date
+    end_date: date
+    days: List[date]
+    output_path: Optional[str]
+    daily_views: Callable[[str], List[int]]
+    available_days: List[str]
+    missing_days: List[Dict[str, object]]
+    total_articles: int
+    ranked: List[Dict[str, object]]
+    ranked_all: List[Dict[str, object]]
+    to_enrich: List[Dict[str, object]]
+
+    def release_aggregate(self) -> None:
+        # Keep daily views of the rows still to enrich only, so many prepared
+        # weeks can wait for a shared enrichment without their aggregates.
+        views = {
+            normalize_title(item["article"]): self.daily_views(
+                normalize_title(item["article"])
+            )
+            for item in self.to_enrich
+        }
+        empty = [0] * len(self.days)
+        self.daily_views = lambda title: views.get(title, empty)
+
+
+def combination_args(
+    args: argparse.Namespace, project: str, access: str
+) -> argparse.Namespace:
+    combo_args = argparse.Namespace(**vars(args))
+    combo_args.project = project
+    combo_args.access = access
+    combo_args.json_dir = str(Path(args.json_dir) / project / access)
+    combo_args.raw_json_dir = str(Path(args.raw_json_dir) / project / access)
+    if args.format != "json":
+        combo_args.output = f"weekly_data.{project}.{access}.{args.format}"
+    return combo_args
+
+
+def collect_batch(
+    args: argparse.Namespace,
+    session: requests.Session,
+    cache: Optional[DailyTopCache],
+    archive: Optional[DailyStore],
+    store: Optional[MetadataStore],
+    start_date: date,
+    end_date: date,
+    days: List[date],
+) -> int:
+    combinations = [
+        (project, access) for project in args.projects for access in args.accesses
+    ]
+    results = fetch_daily_batch(
+        session,
+        combinations,
+        days,
+        args.timeout,
+        args.fetch_concurrency,
+        cache,
+        archive,
+        args.offline,
+    )
+    print_cache_summary(cache)
+
+    failed: List[str] = []
+    weeks: List[PreparedWeek] = []
+    for project, access in combinations:
+        prepared, status = prepare_week(
+            combination_args(args, project, access),
+            session,
+            cache,
+            archive,
+            results[(project, access)],
+        )
+        if prepared is None:
+            print(status.error, file=sys.stderr)
+            failed.append(f"{project}/{access}")
+            continue
+        weeks.append(prepared)
 
+    # Access types of the same project share titles, so their metadata is
+    # looked up once over the union of their top-N lists.
+    for project in args.projects:
+        project_weeks = [week for week in weeks if week.args.project == project]
+        if not project_weeks:
+            continue
+        titles = [str(item["article"]) for week in project_weeks for item in week.to_enrich]
+        enrichment = fetch_enrichment(
+            session,
+            project,
+            titles,
+            args.thumbsize,
+            args.timeout,
+            store,
+            max_in_flight=args.enrichment_concurrency,
+            separate_requests=args.separate_metadata_requests,
+        )
+        for week in project_weeks:
+            apply_enrichment(
+                week.args,
+                week.to_enrich,
+                week.days,
+                week.daily_views,
+                week.start_date,
+                week.end_date,
+                *enrichment,
+            )
+            write_prepared_week(week, CollectStatus())
+            print(
+                f"Wrote {week.args.project}/{week.args.access}: "
+                f"{len(week.ranked)} article(s).",
+                file=sys.stderr,
+            )
+
+    if failed:
+        print(f"Failed combinations: {', '.join(failed)}", file=sys.stderr)
+        return 1
     return 0
 
 
+def repair_week(
+    args: argparse.Namespace,
+    session: requests.Session,
+    cache: Optional[DailyTopCache],
+    archive: Optional[DailyStore],
+    store: Optional[MetadataStore],
+) -> Optional[Tuple[Optional[Dict[str, object]], Optional[Dict[str, object]], CollectStatus]]:
+    try:
+        start_date, end_date, days = week_dates(args.year, args.week)
+    except ValueError:
+        return None
+    output_path = resolve_output_path(
+        args.format, args.output, args.year, args.week, args.json_dir
+    )
+    raw_output_path = resolve_raw_output_path(args.raw_json_dir, args.year, args.week)
+    existing = load_json_file(Path(output_path)) if output_path else None
+    raw = load_json_file(Path(raw_output_path))
+    if (
+        existing is None
+        or raw is None
+        or not isinstance(existing.get("articles"), list)
+        or not isinstance(raw.get("articles"), list)
+        or not isinstance(existing.get("missing_days", []), list)
+    ):
+        print(
+            "Cannot repair: enriched or raw JSON missing or unreadable; "
+            "collecting the whole week.",
+            file=sys.stderr,
+        )
+        return None
+
+    status = CollectStatus(output_path=output_path, raw_output_path=raw_output_path)
+    missing_records = [
+        record for record in existing.get("missing_days", []) if isinstance(record, dict)
+    ]
+    missing_dates = {str(record.get("date")) for record in missing_records}
+    today = datetime.now(timezone.utc).date()
+    repair_days = [day for day in days if day.isoformat() in missing_dates and day < today]
+    status.missing_days = missing_records
+    if not repair_days:
+        print("Nothing to repair in this week.", file=sys.stderr)
+        return existing, raw, status
+
+    # A repair must ask the API again, not replay the 404 that caused it.
+    if cache is not None:
+        for day in repair_days:
+            cache.discard_missing(args.project, args.access, day)
+    results = fetch_daily_lists(
+        session,
+        args.project,
+        args.access,
+        repair_days,
+        args.timeout,
+        args.fetch_concurrency,
+        cache,
+        archive,
+        args.offline,
+    )
+    recovered_days: List[date] = []
+    recovered_lists: List[List[Dict[str, object]]] = []
+    still_missing: Dict[str, Dict[str, object]] = {}
+    for day, result in zip(repair_days, results):
+        if isinstance(result, DailyTopFetchError):
+            if result.status_code != 404:
+                status.returncode = 1
+                status.error = str(result)
+                return None, None, status
+            still_missing[day.isoformat()] = missing_day_record(result)
+            continue
+        recovered_days.append(day)
+        recovered_lists.append(result)
+    if not recovered_days:
+        print(
+            f"Repair: {len(repair_days)} missing day(s) still unavailable; "
+            "week left unchanged.",
+            file=sys.stderr,
+        )
+        return existing, raw, status
+
+    try:
+        delta = aggregate_daily_lists(recovered_lists, args.aggregation_backend)
+    except RuntimeError as exc:
+        status.returncode = 2
+        status.error = str(exc)
+        return None, None, status
+    totals: Dict[str, int] = {}
+    for entry in raw["articles"]:
+        if isinstance(entry, dict) and entry.get("article"):
+            totals[str(entry["article"])] = int(entry.get("views", 0))
+    for title, views in delta.totals().items():
+        totals[title] = totals.get(title, 0) + views
+    ranked_all, ranked, total_articles = rank_totals(
+        totals,
+        args.limit,
+        exclude_stopwords=args.exclude_stopwords,
+        include_all=True,
+    )
+
+    def refresh(item: Dict[str, object]) -> Dict[str, object]:
+        key = normalize_title(item["article"])
+        old_views = previous[key].get("daily_views", [])
+        views_by_date = {
+            str(record.get("date")): record.get("views", 0)
+            for record in old_views
+            if isinstance(record, dict)
+        }
+        for day, value in zip(recovered_days, delta.daily_views(key)):
+            views_by_date[day.isoformat()] = value
+        return {
+            "daily_views": [
+                {"date": day.isoformat(), "views": views_by_date.get(day.isoformat(), 0)}
+                for day in days
+            ]
+        }
+
+    previous = load_previous_rows(output_path)
+    new_items = reuse_previous_rows(ranked, previous, refresh=refresh)
+    recovered = {day.isoformat() for day in recovered_days}
+    print(
+        f"Repair: recovered {len(recovered_days)} of {len(repair_days)} missing day(s); "
+        f"{len(ranked) - len(new_items)} row(s) reused, {len(new_items)} to enrich.",
+        file=sys.stderr,
+    )
+    if new_items:
+        # Titles new to the top-N need their views for every day of the week.
+        try:
+            daily_lists, _, _ = collect_daily_lists(
+                args, session, days, cache, archive, allow_missing_days=True
+            )
+            aggregate = aggregate_daily_lists(daily_lists, args.aggregation_backend)
+        except DailyTopFetchError as exc:
+            status.returncode = 1
+            status.error = str(exc)
+            return None, None, status
+        enrich_ranked(
+            args,
+            session,
+            store,
+            new_items,
+            days,
+            aggregate.daily_views,
+            start_date,
+            end_date,
+        )
+
+    available_days = set(existing.get("available_days", [])) | recovered
+    missing_days = [
+        still_missing.get(str(record.get("date")), record)
+        for record in missing_records
+        if str(record.get("date")) not in recovered
+    ]
+    output_data, raw_output_data = week_outputs(
+        args,
+        start_date,
+        end_date,
+        days,
+        [day.isoformat() for day in days if day.isoformat() in available_days],
+        missing_days,
+        total_articles,
+        ranked,
+        ranked_all,
+    )
+    write_week_outputs(args, output_data, raw_output_data, ranked, output_path)
+    status.missing_days = missing_days
+    return output_data, raw_output_data, status
+
+
+def prepare_week(
+    args: argparse.Namespace,
+    session: requests.Session,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    results: Optional[List[DailyTopResult]] = None,
+) -> Tuple[Optional[PreparedWeek], CollectStatus]:
+    status = CollectStatus()
+    try:
+        start_date, end_date, days = week_dates(args.year, args.week)
+    except ValueError as exc:
+        status.returncode = 2
+        status.error = f"Invalid year/week: {exc}"
+        return None, status
+    output_path = resolve_output_path(
+        args.format, args.output, args.year, args.week, args.json_dir
+    )
+
+    collect_days = days
+    pending_days: List[date] = []
+    if args.incremental:
+        today = datetime.now(timezone.utc).date()
+        collect_days = [day for day in days if day < today]
+        pending_days = [day for day in days if day >= today]
+        if not collect_days:
+            status.returncode = 1
+            status.error = "No finished day in this week yet; nothing to update."
+            return None, status
+
+    try:
+        with stage("daily_fetch"):
+            daily_lists, available_days, missing_days = collect_daily_lists(
+                args,
+                session,
+                collect_days,
+                cache,
+                archive,
+                args.allow_missing_days or args.incremental,
+                results,
+            )
+    except DailyTopFetchError as exc:
+        status.returncode = 1
+        status.error = str(exc)
+        return None, status
+    for day in pending_days:
+        daily_lists.append([])
+        missing_days.append(pending_day_record(day))
+
+    if not any(daily_lists):
+        status.returncode = 1
+        status.error = (
+            "No daily data available for this week; refusing to write an empty week."
+        )
+        return None, status
+    try:
+        with stage("aggregate"):
+            aggregate = aggregate_daily_lists(daily_lists, args.aggregation_backend)
+    except RuntimeError as exc:
+        status.returncode = 2
+        status.error = str(exc)
+        return None, status
+
+    with stage("rank"):
+        ranked_all, ranked, total_articles = rank_totals(
+            aggregate.totals(ordered=True),
+            args.limit,
+            exclude_stopwords=args.exclude_stopwords,
+            include_all=args.format == "json",
+            ordered=True,
+        )
+    to_enrich = ranked
+    if args.incremental:
+        to_enrich = reuse_previous_rows(
+            ranked,
+            load_previous_rows(output_path),
+            refresh=lambda item: {
+                "daily_views": daily_views_records(
+                    days, aggregate.daily_views(normalize_title(item["article"]))
+                )
+            },
+        )
+        print(
+            f"Incremental update: {len(ranked) - len(to_enrich)} row(s) reused, "
+            f"{len(to_enrich)} to enrich.",
+            file=sys.stderr,
+        )
+    prepared = PreparedWeek(
+        args,
+        start_date,
+        end_date,
+        days,
+        output_path,
+        aggregate.daily_views,
+        available_days,
+        missing_days,
+        total_articles,
+        ranked,
+        ranked_all,
+        to_enrich,
+    )
+    return prepared, status
+
+
+def write_prepared_week(
+    prepared: PreparedWeek, status: CollectStatus
+) -> Tuple[Dict[str, object], Dict[str, object], CollectStatus]:
+    output_data, raw_output_data = week_outputs(
+        prepared.args,
+        prepared.start_date,
+        prepared.end_date,
+        prepared.days,
+        prepared.available_days,
+        prepared.missing_days,
+        prepared.total_articles,
+        prepared.ranked,
+        prepared.ranked_all,
+    )
+    status.output_path = prepared.output_path
+    with stage("write"):
+        status.raw_output_path = write_week_outputs(
+            prepared.args,
+            output_data,
+            raw_output_data,
+            prepared.ranked,
+            prepared.output_path,
+        )
+    status.missing_days = prepared.missing_days
+    return output_data, raw_output_data, status
+
+
+def collect_week(
+    args: argparse.Namespace,
+    session: requests.Session,
+    cache: Optional[DailyTopCache] = None,
+    archive: Optional[DailyStore] = None,
+    store: Optional[MetadataStore] = None,
+) -> Tuple[Optional[Dict[str, object]], Optional[Dict[str, object]], CollectStatus]:
+    # Importable entry point: the caller owns the session, caches and store.
+    if args.repair_missing_days:
+        repaired = repair_week(args, session, cache, archive, store)
+        if repaired is not None:
+            return repaired
+
+    prepared, status = prepare_week(args, session, cache, archive)
+    if prepared is None:
+        return None, None, status
+    enrich_ranked(
+        args,
+        session,
+        store,
+        prepared.to_enrich,
+        prepared.days,
+        prepared.daily_views,
+        prepared.start_date,
+        prepared.end_date,
+    )
+    return write_prepared_week(prepared, status)
+
+
+def close_metadata_store(store: Optional[MetadataStore]) -> None:
+    # Hit/miss counters cover the whole run, so they are printed once here.
+    if store is not None:
+        print(store.summary(), file=sys.stderr)
+        store.close()
+
+
+def main() -> int:
+    args = parse_args()
+
+    if args.window:
+        session = session_from_args(args)
+        store = metadata_store_from_args(args)
+        try:
+            status = collect_window(
+                args,
+                session,
+                cache_from_args(args),
+                daily_store_from_args(args),
+                store,
+            )
+        except RuntimeError as exc:
+            print(str(exc), file=sys.stderr)
+            return 1
+        finally:
+            close_metadata_store(store)
+        print(session.stats.summary(), file=sys.stderr)
+        return status
+
+    try:
+        start_date, end_date, days = week_dates(args.year, args.week)
+    except ValueError as exc:
+        print(f"Invalid year/week: {exc}", file=sys.stderr)
+        return 2
+
+    output_path = resolve_output_path(
+        args.format, args.output, args.year, args.week, args.json_dir
+    )
+
+    session = session_from_args(args)
+    cache = cache_from_args(args)
+    archive = daily_store_from_args(args)
+    store = metadata_store_from_args(args)
+
+    if args.batch:
+        try:
+            status = collect_batch(
+                args, session, cache, archive, store, start_date, end_date, days
+            )
+        except RuntimeError as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
+        finally:
+            close_metadata_store(store)
+        print(session.stats.summary(), file=sys.stderr)
+        return status
+
+    if args.from_raw:
+        try:
+            status = rederive_week(
+                args,
+                session,
+                cache,
+                archive,
+                store,
+                start_date,
+                end_date,
+                days,
+                output_path,
+            )
+        except RuntimeError as exc:
+            print(str(exc), file=sys.stderr)
+            return 1
+        finally:
+            close_metadata_store(store)
+        print(session.stats.summary(), file=sys.stderr)
+        return status
+
+    try:
+        _, _, status = collect_week(args, session, cache, archive, store)
+    except RuntimeError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    finally:
+        close_metadata_store(store)
+    if status.error:
+        print(status.error, file=sys.stderr)
+    print(session.stats.summary(), file=sys.stderr)
+    return status.returncode
+
+
 if __name__ == "__main__":
     raise SystemExit(main())